@@ -5,14 +5,21 @@
 #     Purpose: Handles all signal processing functions related to accessing microphones + converting PCM data to spectra
 #
 #   General Functions:
-#       o freq,fftdata = dofft(pcmdata,fs,alpha): Runs fft on pcmdata with sampling frequency
-#           fs using cosine taper (Tukey) defined by alpha
+#       o p = getpyaudio(): Returns the shared PyAudio instance (created on first call)
+#       o miclist,indices,p = listaudiodevices(rescan): Lists input devices (cached unless rescan=True)
+#       o spectra = _psd_kernel(X, scale): Numba-compiled (if available) conversion of rfft output X to log10 PSD
+#       o out = windowedmax(spectra, inds, fsc): Numba-compiled (if available) windowed max of 2D spectra about inds
+#       o spectra = dofft(pcmdata,fftsettings): Runs real-input fft (scipy.fft.rfft) on pcmdata with the length, cosine
+#           taper (Tukey) and bin pooling in the fftsettings tuple published by calc_settings
 #   AudioProcessor Functions:
-#       o __init__(datasource)
+#       o __init__(datasource, maxNfreqs): maxNfreqs caps the number of frequency bins emitted per spectrum
 #       o Run(): A separate function called from main.py immediately after initializing the thread to start data 
 #           collection. Here, the callback function which updates the audio stream for WiNRADIO threads is declared
 #           and the stream is directed to this callback function. This also contains the primary thread loop which 
 #           updates data from either the WiNRADIO or audio file continuously using dofft() and the conversion eqns.
+#       o writeringbuffer(samples)/readringbuffer(N): Add PCM data to/pull the latest N points from the mic ring buffer
+#       o requestabort(): Flags the thread loop and mic callback to stop without waiting for cleanup (follow with
+#           abort() to close the stream/WAV file)
 #       o abort(): Aborts the thread, sends final data to the event loop and notifies the event loop that the
 #           thread has been terminated
 #       o terminate(errortype): terminates thread due to internal issue
@@ -31,6 +38,7 @@
 # ============================================================================================================
 
 import numpy as np
+import scipy.fft as sfft #real-input FFT (pocketfft)
 from scipy.io import wavfile as sciwavfile #for wav file reading
 from scipy.signal import tukey #taper generation
 
@@ -40,7 +48,7 @@ from PyQt5.QtCore import pyqtSlot, pyqtSignal, QObject
 from PyQt5.Qt import QRunnable
 
 import time as timemodule
-import datetime as dt
+import threading
 
 from traceback import print_exc as trace_error
 
@@ -50,28 +58,84 @@ from sys import platform
 
 import pyaudio
 
+import math
+try: #numba is optional- if it isn't installed, dofft falls back to numpy
+    from numba import njit
+    hasnumba = True
+except ImportError:
+    hasnumba = False
+    def njit(*args, **kwargs): #placeholder decorator so _psd_kernel/windowedmax can still be defined
+        return lambda f: f
 
-def listaudiodevices():
-    miclist = []
-    indices = []
+
+#single PyAudio instance shared by the whole program (creating one probes every host API) + cached device list
+_pyaudioinstance = None
+_audiodevices = None
+
+def getpyaudio():
+    global _pyaudioinstance
+    if _pyaudioinstance is None:
+        _pyaudioinstance = pyaudio.PyAudio()
+    return _pyaudioinstance
     
-    p = pyaudio.PyAudio()
-    for i in range(p.get_device_count()):
-        try:
-            if (p.get_device_info_by_host_api_device_index(0, i).get('maxInputChannels')) > 0:
-                miclist.append(p.get_device_info_by_index(i).get('name'))
-                indices.append(i)
-                #cdict = p.get_device_info_by_index(i)
-                #for ckey in cdict:
-                #    print(f"{ckey}: {cdict[ckey]}\n")
-        except OSError:
-            pass
     
-    return miclist,indices,p
+def listaudiodevices(rescan=False):
+    global _audiodevices
+    
+    p = getpyaudio()
+    if rescan or _audiodevices is None:
+        miclist = []
+        indices = []
+        for i in range(p.get_device_count()):
+            try:
+                if (p.get_device_info_by_host_api_device_index(0, i).get('maxInputChannels')) > 0:
+                    miclist.append(p.get_device_info_by_index(i).get('name'))
+                    indices.append(i)
+                    #cdict = p.get_device_info_by_index(i)
+                    #for ckey in cdict:
+                    #    print(f"{ckey}: {cdict[ckey]}\n")
+            except OSError:
+                pass
+        _audiodevices = (miclist, indices)
+    
+    miclist, indices = _audiodevices
+    return list(miclist),list(indices),p
             
 
     
     
+#fused |X|^2 + scaling + clamping + log10 in one pass over the rfft output (no intermediate numpy arrays)
+#scale = 1/df (times any PCM unit conversion squared)
+@njit(cache=True, fastmath=True)
+def _psd_kernel(X, scale):
+    out = np.empty(X.shape[0], dtype=np.float32)
+    for k in range(X.shape[0]):
+        r = X[k].real
+        i = X[k].imag
+        v = max((r*r + i*i)*scale, 1.0E-8) #branch-free clamp lets LLVM vectorize log10 (SVML) with fastmath
+        out[k] = math.log10(v)
+    return out
+    
+    
+    
+#max of each column of spectra (freq x time) over the bins [inds[k]-fsc, inds[k]+fsc) for every k (used to downsample plots)
+@njit(cache=True, nogil=True) #releases the GIL so plot workers don't block the GUI thread
+def windowedmax(spectra, inds, fsc):
+    lenspec = spectra.shape[0]
+    ncols = spectra.shape[1]
+    out = np.empty((inds.shape[0], ncols), dtype=spectra.dtype)
+    for k in range(inds.shape[0]):
+        s = max(0, inds[k] - fsc)
+        e = min(lenspec, inds[k] + fsc)
+        for c in range(ncols):
+            out[k,c] = spectra[s,c]
+        for j in range(s+1, e): #row-wise so the inner loop walks contiguous memory
+            for c in range(ncols):
+                v = spectra[j,c]
+                if v > out[k,c]:
+                    out[k,c] = v
+    return out
+    
     
 
 # =============================================================================
@@ -82,7 +146,7 @@ def listaudiodevices():
 class AudioProcessor(QRunnable): 
 
     #initializing current thread (saving variables, reading audio data or contacting/configuring receiver)
-    def __init__(self, p, datasource, savedir, slash, tabID, starttime, fftwindow, dt, alpha, *args,**kwargs):
+    def __init__(self, p, datasource, savedir, slash, tabID, starttime, fftwindow, dt, alpha, maxNfreqs=None, *args,**kwargs):
         super(AudioProcessor, self).__init__()
 
         self.p = p #PyAudio instance if calling from mic
@@ -95,9 +159,12 @@ class AudioProcessor(QRunnable):
         self.fftwindow = fftwindow
         self.dt = dt
         self.alpha = alpha
+        self.maxNfreqs = maxNfreqs #max number of frequency bins per spectrum passed back (None = full spectrum)
         
         #initializing inner workings
         self.isrunning = False  #set to true while running
+        self.isready = threading.Event() #set at the end of __init__
+        self.callbackrunning = [True] #shared with the mic callback closure (list so terminate() can flip it in place)
         self.signals = ThreadProcessorSignals() # signal connections
         
         self.reason = 0
@@ -119,10 +186,9 @@ class AudioProcessor(QRunnable):
             shcopy(self.audiofile, self.wavfilename) #copying audio file if datasource = from file
             self.fs, snd = sciwavfile.read(self.audiofile) #reading file
             
-            if chnum > 0:
-                self.audiostream = snd[:, chnum-1]
-            else:
-                self.audiostream = snd
+            #storing file PCM data as a contiguous float32 array (single precision FFT) so each frame is a view, not a copy
+            self.audiostream = np.ascontiguousarray(snd[:, chnum-1] if chnum > 0 else snd, dtype=np.float32)
+            self.pcmscale = 1 #file data is already in bits
             
             self.lensignal = len(self.audiostream)
                 
@@ -132,9 +198,13 @@ class AudioProcessor(QRunnable):
             self.audiosourceindex = int(datasource[4:])
             
             self.fs = int(np.round(p.get_device_info_by_index(self.audiosourceindex)['defaultSampleRate'])) #get sampling frequency
-            self.sampwidth = 2 #2 bytes per sample corresponds to 16-bit integer
-            self.frametype = pyaudio.paInt16
-            self.audiostream = [0]*100000
+            self.sampwidth = 2 #2 bytes per sample corresponds to 16-bit integer (WAV file)
+            self.frametype = pyaudio.paFloat32 #PyAudio delivers float32 samples (-1 to 1) so the FFT path needs no cast
+            self.pcmscale = 32768 #converts float samples to 16-bit integer units (applied to the PSD scale factor)
+            
+            #float32 ring buffer holding the most recent PCM data (fftwindow <= 1 sec so N is at most ~fs points)
+            self.audio_ring = np.zeros(max(4*self.fs, 100000), dtype=np.float32)
+            self.write_idx = 0
             
             #setup WAV file to write (if audio or test, source file is copied instead)
             self.wavfile = wave.open(self.wavfilename,'wb')
@@ -142,51 +212,67 @@ class AudioProcessor(QRunnable):
             wave.Wave_write.setsampwidth(self.wavfile,2) #sample size configured as int16
             wave.Wave_write.setframerate(self.wavfile,self.fs)
             
+            #PCM bytes are batched and written to the WAV file every ~0.1 sec instead of on every callback
+            self.wav_buf = bytearray()
+            self.wav_buf_limit = int(self.fs*0.1)*self.sampwidth
+            
         else:
             self.terminate(1) #terminate before starting: invalid datasource
         
         self.isrunning = True
+        self.isready.set() #releases the barrier in run()
         
         
 
     @pyqtSlot()
     def run(self):
         
-        #barrier to prevent signal processor loop from starting before __init__ finishes
-        counts = 0
-        while not self.isrunning:
-            counts += 1
-            if self.reason:
-                return
-            elif counts > 100:
-                self.terminate(3)
-                return
-                
-            timemodule.sleep(0.1)
+        #barrier to prevent signal processor loop from starting before __init__ finishes (returns as soon as it's set)
+        if not self.isready.wait(timeout=10.0):
+            self.terminate(3)
+            return
             
         if self.reason: #just in case timing issues allow the while loop to terminate and then the reason is changed
             return
-        #if the Run() method gets this far, __init__ has completed successfully (and set self.startthread = 100)
+        #if the Run() method gets this far, __init__ has completed successfully (and set self.isready)
         
         
         #storing FFT settings (this can't happen in __init__ because it might emit updated settings before the slot is connected)
         self.changethresholds(self.fftwindow,self.dt,self.alpha)
         
         if self.fromAudio: #if source is an audio file 
-            self.sampletimes = np.arange(0,self.lensignal/self.fs,self.dt) #sets times to sample from file
-            self.maxnum = len(self.sampletimes)
+            self.sampledt = self.dt #interval between sample times from file (fixed for the whole file)
+            self.maxnum = int(np.ceil(self.lensignal/self.fs/self.sampledt))
+            self.batchsize = 32 #number of frames per batched FFT
             
         else: #using live mic for data source
             self.maxnum = 0 #TODO: ADD INITIALIZATION STUFF HERE
             try:
                 
+                #local aliases for the callback closure (avoids repeated attribute lookups on every callback)
+                callbackrunning = self.callbackrunning
+                writeringbuffer = self.writeringbuffer
+                frombuffer = np.frombuffer
+                float32 = np.float32
+                int16 = np.int16
+                clip = np.clip
+                wavfile = self.wavfile
+                writeframes = wave.Wave_write.writeframes
+                wav_buf = self.wav_buf
+                wav_buf_limit = self.wav_buf_limit
+                
                 #CALLBACK FUNCTION HERE
                 def updateaudiobuffer(bufferdata, nframes, time_info, status):
                     try:
-                        if self.isrunning:
-                            self.audiostream.extend(bufferdata[:]) #append data to end
-                            del self.audiostream[:nframes] #remove data from start
-                            wave.Wave_write.writeframes(self.wavfile, bytearray(bufferdata))
+                        if callbackrunning[0]:
+                            samples = frombuffer(bufferdata, dtype=float32)
+                            writeringbuffer(samples)
+                            #WAV file is still int16: clipped to [-1,1] so out-of-range samples saturate instead of wrapping, and
+                            #scaled by 32767 (not pcmscale=32768) so +1.0 maps to the int16 maximum
+                            wav_buf.extend((clip(samples, -1.0, 1.0)*32767).astype(int16).tobytes())
+                            if len(wav_buf) >= wav_buf_limit:
+                                writeframes(wavfile, wav_buf)
+                                wav_buf.clear()
                             returntype = pyaudio.paContinue
                         else:
                             returntype = pyaudio.paAbort
@@ -212,47 +298,59 @@ class AudioProcessor(QRunnable):
                 
         try:
             # setting up thread while loop- terminates when user clicks "STOP" or audio file finishes processing
-            i = -1
-
-            while self.isrunning:
-                i += 1
-
-                # finds time from processor start in seconds
-                curtime = dt.datetime.utcnow()  # current time
-                deltat = curtime - self.starttime
-
-                #pulling PCM data segment
-                if self.fromAudio:
+            if self.fromAudio: #audio files: FFTs are run on batches of frames (one 2D rfft call per batch)
+                i = 0
+                while self.isrunning:
                     
-                    if i < self.maxnum:
-                        ctime = self.sampletimes[i] #center time for current sample
-                    else:
+                    if i >= self.maxnum:
                         self.terminate(0)
                         return
                         
-                    ctrind = int(np.round(ctime*self.fs))
-                    pmind = int(self.N/2)
+                    #pulling PCM data segments for the current batch (settings read once so a mid-batch change can't mix lengths)
+                    fftsettings = self.fftsettings
+                    N = fftsettings[0]
+                    pmind = int(N/2)
+                    frames = []
+                    frameinfo = []
+                    for j in range(i, min(i + self.batchsize, self.maxnum)):
+                        ctime = j*self.sampledt #center time for current sample
+                        ctrind = int(np.round(ctime*self.fs))
+                        if ctrind - pmind >= 0 and ctrind - pmind + N <= self.lensignal:
+                            frames.append(self.audiostream[ctrind-pmind:ctrind-pmind+N]) #N may be odd
+                            frameinfo.append((j, ctime))
+                    i += self.batchsize
                     
-                    if ctrind - pmind >= 0 and ctrind + pmind < self.lensignal:       
-                        pcmdata = self.audiostream[ctrind-pmind:ctrind+pmind]
-                    else:
-                        pcmdata = None
-                        
-
-                else:
-                    ctime = deltat.total_seconds()
-                    pcmdata = np.array(self.audiostream[-self.N:])
+                    if frames:
+                        allspectra = self.dofft(np.stack(frames), fftsettings)
+                        for (j, ctime), spectra in zip(frameinfo, allspectra):
+                            if not self.isrunning:
+                                break
+                            self.signals.iterated.emit(j,self.maxnum,self.tabID,ctime,spectra) #sends current PSD/frequency, along with progress, back to event loop
+                            timemodule.sleep(0.08)  # tiny pause to free resources
+                    
+            else: #live mic
+                i = -1
+                t0 = timemodule.monotonic() #loop start time (monotonic clock, seconds)
+                nextdeadline = t0
                 
-                if pcmdata is not None:
-                    spectra = self.dofft(pcmdata)
+                while self.isrunning:
+                    i += 1
+                    
+                    #pulling PCM data segment
+                    ctime = timemodule.monotonic() - t0 #time from processor start in seconds
+                    fftsettings = self.fftsettings #read once per frame so a settings change can't mix lengths
+                    pcmdata = self.readringbuffer(fftsettings[0]) #already float32
+                    
+                    spectra = self.dofft(pcmdata, fftsettings)
                     self.signals.iterated.emit(i,self.maxnum,self.tabID,ctime,spectra) #sends current PSD/frequency, along with progress, back to event loop
-                        
-                if self.fromAudio:
-                    timemodule.sleep(0.08)  # tiny pause to free resources
                     
-                else: #wait for time threshold before getting next point
-                    while (dt.datetime.utcnow() - curtime).total_seconds() < self.dt:
-                        timemodule.sleep(0.1)  
+                    #wait for time threshold before getting next point (single sleep for the remaining interval)
+                    nextdeadline += self.dt
+                    remaining = nextdeadline - timemodule.monotonic()
+                    if remaining > 0:
+                        timemodule.sleep(remaining)
+                    else: #fell behind- restart the schedule from now rather than trying to catch up
+                        nextdeadline = timemodule.monotonic()
                     
 
         except Exception: #if the thread encounters an error, terminate
@@ -264,48 +362,106 @@ class AudioProcessor(QRunnable):
     
             
             
-    #function to run fft here
-    def dofft(self, pcmdata): 
-        
-        if self.alpha > 0: #applying Tukey taper if necessary
-            if pcmdata.shape[0] == self.taperlen: 
-                ctaper = self.taper
+    #copies new PCM data from the audio callback into the ring buffer, wrapping around the end if necessary
+    def writeringbuffer(self, samples):
+        n = samples.size
+        ringsize = self.audio_ring.size
+        start = self.write_idx
+        end = start + n
+        if end <= ringsize:
+            self.audio_ring[start:end] = samples
+        else:
+            split = ringsize - start
+            self.audio_ring[start:] = samples[:split]
+            self.audio_ring[:n-split] = samples[split:]
+        self.write_idx = end % ringsize
+        
+        
+    #returns the most recent N points from the ring buffer (a view unless the data wraps around the end of the buffer)
+    def readringbuffer(self, N):
+        end = self.write_idx
+        start = end - N
+        if start >= 0:
+            return self.audio_ring[start:end]
+        else:
+            return np.concatenate((self.audio_ring[start:], self.audio_ring[:end]))
+            
+            
+            
+    #function to run fft here- pcmdata is either one frame (N points) or a 2D (# frames, N) batch, fftsettings is the
+    #self.fftsettings tuple that pcmdata was pulled with (N, taper, work buffer, PSD scale, FFT workers, pooled bin starts)
+    def dofft(self, pcmdata, fftsettings): 
+        N, taper, work, psdscale, fft_workers, binstarts = fftsettings
+        
+        if taper is not None: #applying Tukey taper if necessary (pcmdata is always N points long)
+            if pcmdata.ndim == 1:
+                np.multiply(pcmdata, taper, out=work)
+                pcmdata = work
             else:
-                self.taper = tukey(pcmdata.shape[0], alpha=self.alpha)
-            pcmdata = pcmdata*self.taper
+                pcmdata *= taper #batches are already a new array (np.stack)
         
-        # conducting fft, calculating PSD
-        spectra = np.abs(np.fft.fft(pcmdata)**2)/self.df #PSD = |X(f)^2| / df
-        spectra[np.isinf(spectra)] = 1.0E-8 #replacing negative inf values (spectra power=0) with -1
-    
-        #limiting data to positive/real frequencies only (and convert to dB)
-        spectra = np.log10(spectra[self.keepind])
+        # conducting fft (rfft only returns positive/real frequencies), calculating PSD
+        X = sfft.rfft(pcmdata, n=N, axis=-1, workers=fft_workers)
+        if hasnumba:
+            spectra = _psd_kernel(X.ravel(), psdscale).reshape(X.shape)
+            
+        else:
+            #PSD = |X(f)^2| / df, with |X|^2 = re^2 + im^2 accumulated in place (no complex temporaries)
+            spectra = np.multiply(X.real, X.real)
+            Xi = X.imag
+            spectra += Xi*Xi
+            spectra *= psdscale
+        
+            #clamping zero power to 1E-8 (avoids -inf), convert to dB
+            np.maximum(spectra, 1.0E-8, out=spectra)
+            np.log10(spectra, out=spectra)
+            
+        #max-pooling adjacent bins (if necessary) so at most maxNfreqs points are passed back to the event loop
+        if binstarts is not None:
+            spectra = np.maximum.reduceat(spectra, binstarts, axis=-1)
         
         return spectra
             
     
         
         
+    #runs on the GUI thread (via changethresholds_slot) while run() may be mid-frame, so new settings are built in locals
+    #and published to the processing loop in a single assignment of self.fftsettings
     def calc_settings(self):
         
-        self.N = int(np.round(self.fs*self.fftwindow))
-        if self.N%2: #N must be even
-            self.N += 1
+        #rounding N up to a length with small prime factors keeps pocketfft on its fast mixed-radix path. This slightly
+        #lengthens the FFT window relative to fftwindow, but the frequency resolution changes by less than one bin
+        N = sfft.next_fast_len(int(np.round(self.fs*self.fftwindow)), real=True)
             
-            
-        #define taper if nonzero alpha
-        if self.alpha > 0:
-            self.taper = tukey(self.N, alpha=self.alpha)
-            self.taperlen = len(self.taper)
+        #define taper once here (if nonzero alpha) so dofft never has to regenerate it
+        taper = tukey(N, alpha=self.alpha).astype(np.float32) if self.alpha > 0 else None
+        work = np.empty(N, dtype=np.float32) #reusable buffer for tapered PCM data
+        
+        df = self.fs/N
+        psdscale = self.pcmscale**2/df #PSD scale factor (also converts mic float samples to 16-bit units)
+        freqs = sfft.rfftfreq(N, d=1.0/self.fs)
+        
+        #splitting large transforms (e.g. 1 sec windows) across 2 threads, then running a dummy FFT so pocketfft
+        #builds/caches its plan for this length here instead of on the first frame of the processing loop
+        fft_workers = 2 if N >= 32768 else 1
+        sfft.rfft(np.zeros(N, dtype=np.float32), workers=fft_workers)
+        
+        #blocks of fscale bins are max-pooled in dofft (preserving peaks), output frequencies are the block means
+        nfreqs = freqs.size
+        if self.maxNfreqs is not None and nfreqs > self.maxNfreqs:
+            fscale = int(np.ceil(nfreqs/self.maxNfreqs))
+            binstarts = np.arange(0, nfreqs, fscale)
+            outfreqs = np.add.reduceat(freqs, binstarts)/np.diff(np.append(binstarts, nfreqs))
+            outdf = fscale*df #resolution of the emitted (pooled) spectra
         else:
-            self.taperlen = 0
-        
-        self.df = self.fs/self.N
-        self.freqs_all = np.array([self.df * n if n < self.N / 2 else self.df * (n - self.N) for n in range(self.N)])
-        self.keepind = np.greater_equal(self.freqs_all,0)
-        self.freqs = self.freqs_all[self.keepind]
+            binstarts = None
+            outfreqs = freqs
+            outdf = df
+            
+        self.fftsettings = (N, taper, work, psdscale, fft_workers, binstarts)
+        self.N, self.df, self.freqs, self.outfreqs, self.outdf = N, df, freqs, outfreqs, outdf
                 
-        self.signals.statsupdated.emit(self.tabID,self.fs,self.df,self.N,self.freqs)
+        self.signals.statsupdated.emit(self.tabID,self.fs,self.outdf,self.N,self.outfreqs)
         
         
         
@@ -337,6 +493,11 @@ class AudioProcessor(QRunnable):
         
         
         
+    def requestabort(self): #stops the thread loop/mic callback immediately- lets several processors wind down at once
+        self.isrunning = False
+        self.callbackrunning[0] = False
+        
+        
     @pyqtSlot()
     def abort(self): #executed when user selects "Stop" button
         self.terminate(0) #terminates with exit code 0 (no error because user initiated quit)
@@ -346,11 +507,16 @@ class AudioProcessor(QRunnable):
     def terminate(self,reason):
         self.reason = reason
         self.isrunning = False #guarantees that event loop ends
+        self.callbackrunning[0] = False #and that the mic callback stops
         
-        #close audio file, terminate mic buffer
+        #terminate mic buffer, close audio file- stop_stream blocks until any running callback returns, so it must come
+        #before the batched PCM data is flushed (a callback could otherwise still be appending to/writing wav_buf)
         if not self.fromAudio:
-            wave.Wave_write.close(self.wavfile)
             self.stream.stop_stream()
+            if self.wav_buf: #flushing any remaining batched PCM data
+                wave.Wave_write.writeframes(self.wavfile, self.wav_buf)
+                self.wav_buf.clear()
+            wave.Wave_write.close(self.wavfile)
             self.stream.close()
         
         #signal that tab indicated by curtabnum was closed due to reason indicated by variable 'reason'
@@ -10,14 +10,20 @@
 #       o __init__: Calls functions to initialize GUI
 #       o initUI: Builds GUI window
 #		o makenewtab: Creates a new tab window (make all widgets/buttons here)
-#       o whatTab: gets identifier for open tab
+#       o inittabstate/buildtablayout: Creates a new tab's data container/main layout
+#       o buildspectrofig: Builds a tab's spectrogram figure/canvas/toolbar
+#       o buildmainsettingstab/buildplotsavetab: Builds the settings/save tabs (the save tab is built on first selection)
+#       o whatTab/rebuildtabindices: gets identifier for open tab/rebuilds the tab ID lookup
 #       o renametab: renames open tab
 #       o setnewtabcolor: sets the background color pattern for new tabs
 #       o closecurrenttab: closes open tab
+#       o cleantempfiles/cleanoldtempfiles: deletes this session's temp WAV files/leftovers from a previous session
 #       o savedataincurtab: saves data in open tab (saved file types depend on tab type and user preferences)
 #       o postwarning: posts a warning box specified message
 #       o posterror: posts an error box with a specified message
 #       o postwarning_option: posts a warning box with Okay/Cancel options
+#       o postquestion: posts a reusable Yes/No question box with a specified message
+#       o execmessagebox: shows a cached message box (or a copy if it is already open) with a specified message
 #       o closeEvent: pre-existing function that closes the GUI- function modified to prompt user with an "are you sure" box
 #
 # =============================================================================
@@ -29,8 +35,7 @@
 from sys import argv, exit
 from platform import system as cursys
 from struct import calcsize
-from os import remove, path, listdir
-import shutil
+from os import remove, path
 from traceback import print_exc as trace_error
 from datetime import datetime
 
@@ -39,6 +44,7 @@ if cursys() == 'Windows':
 
 from shutil import copy as shcopy
 from tempfile import gettempdir
+from glob import glob
 
 from PyQt5.QtWidgets import (QMainWindow, QAction, QApplication, QMenu, QLineEdit, QLabel, QSpinBox, QCheckBox,
     QPushButton, QMessageBox, QWidget, QFileDialog, QComboBox, QTextEdit, QTabWidget, QVBoxLayout, QInputDialog, 
@@ -46,15 +52,16 @@ from PyQt5.QtWidgets import (QMainWindow, QAction, QApplication, QMenu, QLineEdi
     QStyle, QStyleOptionTitleBar, QSlider)
 from PyQt5.QtCore import QObjectCleanupHandler, Qt, pyqtSlot, pyqtSignal, QObject
 from PyQt5.QtGui import QIcon, QColor, QPalette, QBrush, QLinearGradient, QFont
-from PyQt5.Qt import QThreadPool
+from PyQt5.Qt import QThreadPool, QRunnable
 
-from scipy.io import wavfile as sciwavfile
 import wave
 
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.colors import ListedColormap, Normalize
+from matplotlib.image import NonUniformImage
+from matplotlib.patches import Rectangle
 from matplotlib import cm
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
@@ -62,6 +69,37 @@ import AudioProcessor as AP
 
 
 
+# =============================================================================
+#   TAB LAYOUT CONSTANTS (widget key, row, column, row span, column span)
+# =============================================================================
+_RIGHT_V = Qt.AlignRight | Qt.AlignVCenter #alignment for widget title labels
+_CENTER_V = Qt.AlignCenter | Qt.AlignVCenter
+
+_TAB_ROWSTRETCH = (1,1,30,9,1) #main tab grid (row 2 holds the spectrogram)
+_TAB_COLSTRETCH = (1,2,2,2,2,2,1)
+
+_MAIN_WIDGET_ORDER = ("start", "stop", "sourcetitle", "datasource", "ctimetitle", "ctime", "timerangetitle", "timerange", "cmintitle", "cmin", "cmaxtitle", "cmax", "fftlentitle", "fftlen", "repratetitle", "reprate", "alphatitle", "alpha", "updatesettings", "specs", "fmintitle", "fmin", "fmaxtitle", "fmax")
+_MAIN_WROWS     = (1,1,2,3, 5,5, 1,1, 2,2,3,3, 4,4,5,5,6,6,1,2, 5,5,6,6)
+_MAIN_WCOLS     = (1,2,1,1, 1,2, 3,4, 3,4,3,4, 3,4,3,4,3,4,5,5, 5,6,5,6)
+_MAIN_WREXT     = (1,1,1,1, 1,1, 1,1, 1,1,1,1, 1,1,1,1,1,1,1,3, 1,1,1,1)
+_MAIN_WCOLEXT   = (1,1,2,2, 1,1, 1,1, 1,1,1,1, 1,1,1,1,1,1,2,2, 1,1,1,1)
+_MAIN_LAYOUT = tuple(zip(_MAIN_WIDGET_ORDER, _MAIN_WROWS, _MAIN_WCOLS, _MAIN_WREXT, _MAIN_WCOLEXT))
+_MAIN_COLSTRETCH = (0,1,1,1,1,1,1,0)
+_MAIN_ROWSTRETCH = (2,1,1,1,1,1,1,4)
+
+_SAVE_WIDGET_ORDER = ("savetitle", "saveaudio", "savespectro", "savefile",     "savetimerangetitle", "savesubset", "starttimetitle", "starttime", "endtimetitle", "endtime",     "spectrosettingstitle", "savecmintitle", "savecmin", "savecmaxtitle", "savecmax", "savefmintitle", "savefmin", "savefmaxtitle", "savefmax")
+_SAVE_WROWS     = (1,2,3,4,  1,2,3,3,4,4,  1,2,2,3,3,4,4,5,5)
+_SAVE_WCOLS     = (1,1,1,1,  3,3,3,4,3,4,  6,6,7,6,7,6,7,6,7)
+_SAVE_WREXT     = (1,1,1,1,  1,1,1,1,1,1,  1,1,1,1,1,1,1,1,1)
+_SAVE_WCOLEXT   = (1,1,1,1,  2,2,1,1,1,1,  2,1,1,1,1,1,1,1,1)
+_SAVE_LAYOUT = tuple(zip(_SAVE_WIDGET_ORDER, _SAVE_WROWS, _SAVE_WCOLS, _SAVE_WREXT, _SAVE_WCOLEXT))
+_SAVE_COLSTRETCH = (6,4,1,2,2,1,2,2,6)
+_SAVE_ROWSTRETCH = (3,1,1,1,1,1,5)
+
+#postwarning_option return values for each message box button
+_OPT_MAP = {QMessageBox.Ok:'okay', QMessageBox.Cancel:'cancel'}
+
+
 
 
 #   DEFINE CLASS FOR PROGRAM (TO BE CALLED IN MAIN)
@@ -125,16 +163,20 @@ class RunProgram(QMainWindow):
         else:
             self.slash = '/'
 
-        #setting up dictionary to store data for each tab
+        #setting up list to store data (TabData) for each tab
         self.alltabdata = []
 
         #tab tracking
         self.totaltabs = 0
-        self.tabnumbers = []
+        self.nprocessing = 0 #number of tabs with a running processor (closeEvent skips the abort pass if zero)
+        self.tabpalette = None #shared tab background, built by setnewtabcolor
+        self.tabindices = {} #tabID -> position in self.alltabdata/self.tabWidget (each tab widget also stores its ID as the "tabID" property)
         
         #getting temporary directory for files
         self.tempdir = gettempdir()
-        self.cleantempfiles()
+        self.anytempfiles = False #set once a processor is started (each one writes a temporary WAV file)
+        self.tempfiles = set() #temporary WAV files written this session, deleted on close
+        self.cleanoldtempfiles()
         
         #default directory
         defaultpath = path.expanduser("~")
@@ -146,6 +188,13 @@ class RunProgram(QMainWindow):
         self.fileoptions = QFileDialog.Options()
         self.fileoptions |= QFileDialog.DontUseNativeDialog
         
+        #message boxes are built once and reused (text is set before each exec_)
+        self.warningbox = QMessageBox(QMessageBox.Warning, "Warning", "", QMessageBox.Ok)
+        self.errorbox = QMessageBox(QMessageBox.Critical, "Error", "", QMessageBox.Ok)
+        self.optionbox = QMessageBox(QMessageBox.Warning, "Warning", "", QMessageBox.Ok | QMessageBox.Cancel)
+        self.questionbox = QMessageBox(QMessageBox.Question, "Message", "", QMessageBox.Yes | QMessageBox.No, self)
+        self.questionbox.setDefaultButton(QMessageBox.No)
+        
         #identifying connected devices
         self.audiosources,self.audiosourceIDs,self.PyAudioObject = AP.listaudiodevices()
         
@@ -154,8 +203,15 @@ class RunProgram(QMainWindow):
         # creating threadpool
         self.threadpool = QThreadPool()
         self.threadpool.setMaxThreadCount(7)
+        self.plotthreadpool = QThreadPool() #separate pool so plot workers don't count against processor threads
+        self.plotthreadpool.setMaxThreadCount(2)
         
         self.maxNfreqs = 200 #max number of frequency datapoints to plot
+        self.maxemitfreqs = 4096 #max number of frequency bins passed from each AudioProcessor per spectrum
+        self.spectrabufferlen = 1024 #initial number of spectra (columns) allocated per tab
+        
+        #loading spectrogram colormap (shared by all tabs)
+        self.loadspectralcolormap()
             
         
         
@@ -195,279 +251,295 @@ class RunProgram(QMainWindow):
 #     SIGNAL PROCESSOR TAB AND INPUTS HERE
 # =============================================================================
     def makenewtab(self):     
+        
+        curtabnum = self.addnewtab()
+        
+        #each build step is wrapped separately so a failure identifies the step that broke
         try:
-
-            curtabnum = self.addnewtab()
-    
-            #creates dictionary entry for current tab- you can add additional key/value combinations for the opened tab at any point after the dictionary has been initialized
-            initstats = {"updated":False,"fs":None,"freqs":[], "N":None, "df":None, "timerange":20, "fftlen":0.5, "crange":[6,11], "reprate":0.1, "alpha":0.25, "frange":[50,1800]}
-            
-            self.alltabdata.append({ "tab":QWidget(), "tablayout":QGridLayout(), "mainLayout":QGridLayout(), 
-                    "tabtype":"newtab", "tabwidget":QTabWidget(), "mainsettingswidget":QWidget(), "plotsavewidget":QWidget(),  "signalmaskwidget":QWidget(), "stats":initstats, "isprocessing":False, "Processor":None, "datasource":None,     "data":{"ctime":0, "maxtime":0, "times":np.array([]), "freqs":np.array([]), "spectra":np.array([[]]), "isplotted":[]}   })
-
-            self.setnewtabcolor(self.alltabdata[curtabnum]["tab"])
-            
-            self.alltabdata[curtabnum]["tablayout"].setSpacing(10)
-    
-            #creating new tab, assigning basic info
-            self.tabWidget.addTab(self.alltabdata[curtabnum]["tab"],'New Tab') 
-            self.tabWidget.setCurrentIndex(curtabnum)
-            self.tabWidget.setTabText(curtabnum, "New Tab #" + str(self.totaltabs))
-            _,self.alltabdata[curtabnum]["tabnum"] = self.whatTab() #assigning unique, unchanging number to current tab
-            self.alltabdata[curtabnum]["tablayout"].setSpacing(10)
-            self.alltabdata[curtabnum]["mainLayout"].setSpacing(10)
-            
-            #and add new buttons and other widgets
-            self.alltabdata[curtabnum]["tabwidgets"] = {}
+            self.inittabstate(curtabnum)
+        except Exception:
+            trace_error()
+            self.posterror("Failed to initialize new tab")
+            return
             
-            #creating plot
-            self.alltabdata[curtabnum]["SpectroFig"] = plt.figure()
-            self.alltabdata[curtabnum]["SpectroCanvas"] = FigureCanvas(self.alltabdata[curtabnum]["SpectroFig"])
-            self.alltabdata[curtabnum]["SpectroAxes"] = plt.axes()
-            self.alltabdata[curtabnum]["SpectroAxes"].set_xlabel('Time (s)')
-            ctime = self.alltabdata[curtabnum]["data"]["ctime"]
-            timerange = self.alltabdata[curtabnum]["stats"]["timerange"]
-            self.alltabdata[curtabnum]["SpectroAxes"].set_xlim(ctime-timerange,ctime)
-            self.alltabdata[curtabnum]["SpectroAxes"].set_ylabel('Frequency (Hz)')
-            self.alltabdata[curtabnum]["SpectroCanvas"].setStyleSheet("background-color:transparent;")
-            self.alltabdata[curtabnum]["SpectroFig"].patch.set_facecolor("None")
-            self.alltabdata[curtabnum]["SpectroFig"].set_tight_layout(True)
-            self.alltabdata[curtabnum]["colorbar"] = self.gencolorbar(curtabnum,initstats["crange"])
+        try:
+            self.buildtablayout(curtabnum)
+        except Exception:
+            trace_error()
+            self.posterror("Failed to build new tab layout")
+            return
             
-            self.alltabdata[curtabnum]["SpectroToolbar"] = CustomToolbar(self.alltabdata[curtabnum]["SpectroCanvas"], self)
+        #building widgets for the settings tab (the save tab is only built once the user first selects it)
+        try:
+            self.buildmainsettingstab(curtabnum, self.alltabdata[curtabnum].stats)
+        except Exception:
+            trace_error()
+            self.posterror("Failed to build new tab settings")
+            return
             
+        try:
+            self.buildspectrofig(curtabnum)
+        except Exception:
+            trace_error()
+            self.posterror("Failed to build new tab spectrogram")
+    
+    
+    #creates TabData entry for a new tab and adds the tab to the window
+    def inittabstate(self, curtabnum):
+        
+        #additional attributes must be added to TabData.__slots__
+        initstats = {"updated":False,"fs":None,"freqs":[], "N":None, "df":None, "timerange":20, "fftlen":0.5, "crange":[6,11], "reprate":0.1, "alpha":0.25, "frange":[50,1800], "plotindices":None, "frangekey":None}
+        
+        self.alltabdata.append(TabData(tab=QWidget(), tablayout=QGridLayout(), mainLayout=QGridLayout(), 
+                tabtype="newtab", tabwidget=QTabWidget(), mainsettingswidget=QWidget(), plotsavewidget=QWidget(), signalmaskwidget=QWidget(), stats=initstats, isprocessing=False, Processor=None, datasource=None,     data={"ctime":0, "maxtime":0, "times":None, "freqs":None, "spectra":None, "ncols":0, "isplotted":None, "plotspectra":None, "nplotted":0, "imageslice":None}, plotsavebuilt=False, plotpending=False, plotrequested=False   ))
+        td = self.alltabdata[curtabnum]
 
-            #creating tab widget
-            self.alltabdata[curtabnum]["tabwidget"].setLayout(self.alltabdata[curtabnum]["tablayout"])
-            self.alltabdata[curtabnum]["tabwidget"].addTab(self.alltabdata[curtabnum]["mainsettingswidget"],"Spectrogram Settings")
-            self.alltabdata[curtabnum]["tabwidget"].addTab(self.alltabdata[curtabnum]["plotsavewidget"],"Save Spectrogram/Audio")
-            self.alltabdata[curtabnum]["mainsettingslayout"] = QGridLayout()
-            self.alltabdata[curtabnum]["plotsavelayout"] = QGridLayout()
-            self.alltabdata[curtabnum]["mainsettingswidget"].setLayout(self.alltabdata[curtabnum]["mainsettingslayout"])
-            self.alltabdata[curtabnum]["plotsavewidget"].setLayout(self.alltabdata[curtabnum]["plotsavelayout"])
-            self.alltabdata[curtabnum]["tabwidget"].setTabEnabled(1,False)
-            
-            #adding widgets to main layout
-            self.alltabdata[curtabnum]["timelabel"] = QLabel("Center Time: 0/0 seconds")
-            self.alltabdata[curtabnum]["timelabel"].setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-            
-            self.alltabdata[curtabnum]["mainLayout"].addWidget(self.alltabdata[curtabnum]["SpectroToolbar"],1,3,1,1)
-            self.alltabdata[curtabnum]["mainLayout"].addWidget(self.alltabdata[curtabnum]["SpectroCanvas"],2,1,1,6) # set dimensions
-            self.alltabdata[curtabnum]["mainLayout"].addWidget(self.alltabdata[curtabnum]["tabwidget"],3,2,1,3)
-            
-            
-            rowstretches = [1,1,30,9,1]
-            for (r,s) in enumerate(rowstretches):
-                self.alltabdata[curtabnum]["mainLayout"].setRowStretch(r,s) #stretching out row with plot axes
-                
-            colstretches = [1,2,2,2,2,2,1]
-            for (c,s) in enumerate(colstretches):
-                self.alltabdata[curtabnum]["mainLayout"].setColumnStretch(c,s) #stretching out row with plot axes
+        self.setnewtabcolor(td.tab)
+        td.tab.setProperty("tabID", self.totaltabs) #assigning unique, unchanging number to tab (read back by whatTab)
+        td.tabnum = self.totaltabs
+        self.tabindices[td.tabnum] = curtabnum
 
+        #creating new tab, assigning basic info
+        self.tabWidget.addTab(td.tab,'New Tab') 
+        self.tabWidget.setCurrentIndex(curtabnum)
+        self.tabWidget.setTabText(curtabnum, "New Tab #" + str(self.totaltabs))
+        
+        
+    #builds the tab's main layout (settings/save tab widget- the spectrogram is added by buildspectrofig)
+    def buildtablayout(self, curtabnum):
+        td = self.alltabdata[curtabnum]
+        
+        td.tablayout.setSpacing(10)
+        td.mainLayout.setSpacing(10)
+        
+        #creating tab widget
+        td.tabwidget.setLayout(td.tablayout)
+        td.tabwidget.addTab(td.mainsettingswidget,"Spectrogram Settings")
+        td.tabwidget.addTab(td.plotsavewidget,"Save Spectrogram/Audio")
+        td.mainsettingslayout = QGridLayout()
+        td.plotsavelayout = QGridLayout()
+        td.mainsettingswidget.setLayout(td.mainsettingslayout)
+        td.plotsavewidget.setLayout(td.plotsavelayout)
+        td.tabwidget.setTabEnabled(1,False)
+        td.tabwidget.currentChanged.connect(self.plotsavetabselected)
+        
+        #adding widgets to main layout
+        td.timelabel = QLabel("Center Time: 0/0 seconds")
+        td.timelabel.setAlignment(_CENTER_V)
+        
+        td.mainLayout.addWidget(td.tabwidget,3,2,1,3)
+        
+        
+        for (r,s) in enumerate(_TAB_ROWSTRETCH):
+            td.mainLayout.setRowStretch(r,s) #stretching out row with plot axes
             
-            #making widgets for settings tab
-            self.alltabdata[curtabnum]["tabwidgets"]["start"] = QPushButton('Start') 
-            self.alltabdata[curtabnum]["tabwidgets"]["start"].clicked.connect(self.startprocessor)
-            self.alltabdata[curtabnum]["tabwidgets"]["stop"] = QPushButton('Stop')
-            self.alltabdata[curtabnum]["tabwidgets"]["stop"].clicked.connect(self.stopprocessor)
-            self.alltabdata[curtabnum]["tabwidgets"]["sourcetitle"] = QLabel("Data Source: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["datasource"] = QComboBox() 
-            for source in self.audiosources:
-                self.alltabdata[curtabnum]["tabwidgets"]["datasource"].addItem(source)
-            self.alltabdata[curtabnum]["tabwidgets"]["datasource"].addItem('WAV File')
-                
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["ctimetitle"] = QLabel("Spectrogram Time: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["ctimetitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["ctime"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setRange(0, 0)
-            self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setSingleStep(0.05)
-            self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setValue(0)
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["timerangetitle"] = QLabel("Time Range: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["timerangetitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["timerange"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["timerange"].setRange(0.25, 30)
-            self.alltabdata[curtabnum]["tabwidgets"]["timerange"].setSingleStep(0.25)
-            self.alltabdata[curtabnum]["tabwidgets"]["timerange"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["timerange"].setValue(initstats['timerange'])
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["cmintitle"] = QLabel("Color Minimum: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["cmintitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmaxtitle"] = QLabel("Color Maximum: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["cmaxtitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"].setRange(0.0, 299.9)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"].setSingleStep(0.1)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"].setDecimals(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"].setValue(initstats["crange"][0])
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"].setRange(0.1, 300)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"].setSingleStep(0.1)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"].setDecimals(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"].setValue(initstats["crange"][1])
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlentitle"] = QLabel("FFT Window Length (s): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlentitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlen"] = QDoubleSpinBox()
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].setRange(0.05, 3)
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].setSingleStep(0.05)
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].setValue(0.3)
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["repratetitle"] = QLabel("Repitition Rate (s): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["repratetitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["reprate"] = QDoubleSpinBox()
-            self.alltabdata[curtabnum]["tabwidgets"]["reprate"].setRange(0.05, 1)
-            self.alltabdata[curtabnum]["tabwidgets"]["reprate"].setSingleStep(0.05)
-            self.alltabdata[curtabnum]["tabwidgets"]["reprate"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["reprate"].setValue(0.1)
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["alphatitle"] = QLabel("Taper Alpha Value: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["alphatitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["alpha"] = QDoubleSpinBox()
-            self.alltabdata[curtabnum]["tabwidgets"]["alpha"].setRange(0, 1)
-            self.alltabdata[curtabnum]["tabwidgets"]["alpha"].setSingleStep(0.01)
-            self.alltabdata[curtabnum]["tabwidgets"]["alpha"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["alpha"].setValue(0.25)
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["fmintitle"] = QLabel("Frequency Min (Hz): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["fmintitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmaxtitle"] = QLabel("Frequency Max (Hz): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["fmaxtitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"] = QSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setRange(0, 49999)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setSingleStep(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setValue(initstats["frange"][0])
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"] = QSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setRange(0, 50000)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setSingleStep(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setValue(initstats["frange"][1])
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["updatesettings"] = QPushButton('Update Settings')
-            self.alltabdata[curtabnum]["tabwidgets"]["updatesettings"].clicked.connect(self.updatecurtabsettings)
-            
-            ctext = self.getspecs()
-            self.alltabdata[curtabnum]["tabwidgets"]["specs"] = QLabel(ctext)
-            
-            
-            #should be 19 entries 
-            widgetorder = ["start", "stop", "sourcetitle", "datasource", "ctimetitle", "ctime", "timerangetitle", "timerange", "cmintitle", "cmin", "cmaxtitle", "cmax", "fftlentitle", "fftlen", "repratetitle", "reprate", "alphatitle", "alpha", "updatesettings", "specs", "fmintitle", "fmin", "fmaxtitle", "fmax"]
-            wrows     = [1,1,2,3, 5,5, 1,1, 2,2,3,3, 4,4,5,5,6,6,1,2, 5,5,6,6]
-            wcols     = [1,2,1,1, 1,2, 3,4, 3,4,3,4, 3,4,3,4,3,4,5,5, 5,6,5,6]
-            wrext     = [1,1,1,1, 1,1, 1,1, 1,1,1,1, 1,1,1,1,1,1,1,3, 1,1,1,1]
-            wcolext   = [1,1,2,2, 1,1, 1,1, 1,1,1,1, 1,1,1,1,1,1,2,2, 1,1,1,1]
+        for (c,s) in enumerate(_TAB_COLSTRETCH):
+            td.mainLayout.setColumnStretch(c,s) #stretching out row with plot axes
+        
+        ##making the current layout for the tab
+        td.tab.setLayout(td.mainLayout)
     
-            #adding user inputs
-            for i,r,c,re,ce in zip(widgetorder,wrows,wcols,wrext,wcolext):
-                self.alltabdata[curtabnum]["mainsettingslayout"].addWidget(self.alltabdata[curtabnum]["tabwidgets"][i],r,c,re,ce)
     
-            #adjusting stretch factors for all rows/columns
-            colstretch = [0,1,1,1,1,1,1,0]
-            for col,cstr in zip(range(0,len(colstretch)),colstretch):
-                self.alltabdata[curtabnum]["mainsettingslayout"].setColumnStretch(col,cstr)
-            rowstretch = [2,1,1,1,1,1,1,4]
-            for row,rstr in zip(range(0,len(rowstretch)),rowstretch):
-                self.alltabdata[curtabnum]["mainsettingslayout"].setRowStretch(row,rstr)
+    #builds spectrogram figure, canvas, and toolbar for a tab (colorbar is added when the canvas is first shown)
+    def buildspectrofig(self, curtabnum):
+        td = self.alltabdata[curtabnum]
+        
+        #built in locals and only stored on the tab once complete, so a failed build leaves SpectroAxes/SpectroCanvas = None
+        fig = Figure() #not registered with pyplot, so it is released along with the tab
+        canvas = SpectroCanvas(fig, lambda tabID=td.tabnum: self.buildtabcolorbar(tabID)) #colorbar is drawn on first paint
+        ax = fig.add_subplot(111)
+        ax.set_xlabel('Time (s)')
+        ctime = td.data["ctime"]
+        timerange = td.stats["timerange"]
+        ax.set_xlim(ctime-timerange,ctime)
+        ax.set_ylabel('Frequency (Hz)')
+        canvas.setStyleSheet("background-color:transparent;")
+        fig.patch.set_facecolor("None")
+        fig.set_tight_layout(True)
+        toolbar = CustomToolbar(canvas, self)
+        ax.callbacks.connect('xlim_changed', lambda ax, tabID=td.tabnum: self.spectroxlimchanged(tabID)) #also fires on toolbar pan/zoom
+        
+        td.mainLayout.addWidget(canvas,2,1,1,6) # set dimensions
+        td.mainLayout.addWidget(toolbar,1,3,1,1)
+        td.SpectroFig, td.SpectroCanvas, td.SpectroAxes, td.SpectroToolbar = fig, canvas, ax, toolbar
+        
+        
+    #adds colorbar to a tab's spectrogram (called once, when its canvas is first shown)
+    def buildtabcolorbar(self, tabID):
+        if tabID in self.tabindices:
+            curtabnum = self.tabindices[tabID]
+            self.alltabdata[curtabnum].colorbar = self.gencolorbar(curtabnum,self.alltabdata[curtabnum].stats["crange"])
+            
+            
+    def buildmainsettingstab(self, curtabnum, initstats):
+        
+        td = self.alltabdata[curtabnum]
+        
+        #making widgets for settings tab (all created at once in a single dict literal)
+        tw = td.tabwidgets = {
+            "start":QPushButton('Start'),
+            "stop":QPushButton('Stop'),
+            "sourcetitle":QLabel("Data Source: "),
+            "datasource":QComboBox(),
+            "ctimetitle":QLabel("Spectrogram Time: "),
+            "ctime":self.makedoublespinbox(0, 0, 0.05, 2, 0),
+            "timerangetitle":QLabel("Time Range: "),
+            "timerange":self.makedoublespinbox(0.25, 30, 0.25, 2, initstats['timerange']),
+            "cmintitle":QLabel("Color Minimum: "),
+            "cmaxtitle":QLabel("Color Maximum: "),
+            "cmin":self.makedoublespinbox(0.0, 299.9, 0.1, 1, initstats["crange"][0]),
+            "cmax":self.makedoublespinbox(0.1, 300, 0.1, 1, initstats["crange"][1]),
+            "fftlentitle":QLabel("FFT Window Length (s): "),
+            "fftlen":self.makedoublespinbox(0.05, 3, 0.05, 2, 0.3),
+            "repratetitle":QLabel("Repitition Rate (s): "),
+            "reprate":self.makedoublespinbox(0.05, 1, 0.05, 2, 0.1),
+            "alphatitle":QLabel("Taper Alpha Value: "),
+            "alpha":self.makedoublespinbox(0, 1, 0.01, 2, 0.25),
+            "fmintitle":QLabel("Frequency Min (Hz): "),
+            "fmaxtitle":QLabel("Frequency Max (Hz): "),
+            "fmin":self.makeintspinbox(0, 49999, 1, initstats["frange"][0]),
+            "fmax":self.makeintspinbox(0, 50000, 1, initstats["frange"][1]),
+            "updatesettings":QPushButton('Update Settings'),
+            "specs":QLabel(self.getspecs())}
+        
+        tw["datasource"].addItems(list(self.audiosources) + ['WAV File'])
+            
+        
+        tw["ctimetitle"].setAlignment(_RIGHT_V)
+        tw["timerangetitle"].setAlignment(_RIGHT_V)
+        tw["cmintitle"].setAlignment(_RIGHT_V)
+        tw["cmaxtitle"].setAlignment(_RIGHT_V)
+        tw["fftlentitle"].setAlignment(_RIGHT_V)
+        tw["repratetitle"].setAlignment(_RIGHT_V)
+        tw["alphatitle"].setAlignment(_RIGHT_V)
+        tw["fmintitle"].setAlignment(_RIGHT_V)
+        tw["fmaxtitle"].setAlignment(_RIGHT_V)
+        
+        
+        #adding user inputs (updates suspended so the grid is only laid out once)
+        td.mainsettingswidget.setUpdatesEnabled(False)
+        addwidget = td.mainsettingslayout.addWidget
+        for i,r,c,re,ce in _MAIN_LAYOUT:
+            addwidget(tw[i],r,c,re,ce)
+
+        #adjusting stretch factors for all rows/columns
+        for col,cstr in enumerate(_MAIN_COLSTRETCH):
+            td.mainsettingslayout.setColumnStretch(col,cstr)
+        for row,rstr in enumerate(_MAIN_ROWSTRETCH):
+            td.mainsettingslayout.setRowStretch(row,rstr)
+        td.mainsettingswidget.setUpdatesEnabled(True)
+        td.mainsettingslayout.activate()
+        
+        #connecting signals once all widgets are in place
+        tw["start"].clicked.connect(self.startprocessor)
+        tw["stop"].clicked.connect(self.stopprocessor)
+        tw["updatesettings"].clicked.connect(self.updatecurtabsettings)
+        
+        
+        
+    #creates and configures a QDoubleSpinBox in one call
+    def makedoublespinbox(self, minval, maxval, step, decimals, value):
+        spinbox = QDoubleSpinBox()
+        spinbox.setRange(minval, maxval)
+        spinbox.setSingleStep(step)
+        spinbox.setDecimals(decimals)
+        spinbox.setValue(value)
+        return spinbox
+        
+        
+    #creates and configures a QSpinBox in one call
+    def makeintspinbox(self, minval, maxval, step, value):
+        spinbox = QSpinBox()
+        spinbox.setRange(minval, maxval)
+        spinbox.setSingleStep(step)
+        spinbox.setValue(value)
+        return spinbox
+        
+        
+        
+    #builds the save spectrogram/audio tab the first time the user selects it
+    @pyqtSlot(int)
+    def plotsavetabselected(self, index):
+        if index == 1:
+            curtabnum = self.tabWidget.currentIndex()
+            if not self.alltabdata[curtabnum].plotsavebuilt:
+                self.buildplotsavetab(curtabnum)
                 
                 
-            #making widgets for file saving tab
-            self.alltabdata[curtabnum]["tabwidgets"]["savetitle"] = QLabel("Save: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["saveaudio"] = QCheckBox('Save audio (WAV) file')
-            self.alltabdata[curtabnum]["tabwidgets"]["saveaudio"].setChecked(True)
-            self.alltabdata[curtabnum]["tabwidgets"]["savespectro"] = QCheckBox('Save spectrogram')  
-            self.alltabdata[curtabnum]["tabwidgets"]["savespectro"].clicked.connect(self.updatesavespectrobox)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefile"] = QPushButton('Save File(s)') 
-            self.alltabdata[curtabnum]["tabwidgets"]["savefile"].clicked.connect(self.savefiles)
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["timerangetitle"] = QLabel("Time range to save:")
-            self.alltabdata[curtabnum]["tabwidgets"]["savesubset"] = QCheckBox('Save subset')
-            self.alltabdata[curtabnum]["tabwidgets"]["savesubset"].clicked.connect(self.updatesavesubsetbox)
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["starttimetitle"] = QLabel("Start Time: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["starttimetitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["starttime"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setRange(0, 0)
-            self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setSingleStep(0.05)
-            self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setValue(0)
-            self.alltabdata[curtabnum]["tabwidgets"]["endtimetitle"] = QLabel("End Time: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["endtimetitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["endtime"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setRange(0, 0)
-            self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setSingleStep(0.05)
-            self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setDecimals(2)
-            self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setValue(0)
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["spectrosettingstitle"] = QLabel("Spectrogram Settings: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmintitle"] = QLabel("Color Min: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmintitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmaxtitle"] = QLabel("Color Max: ")
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmaxtitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmin"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setRange(0.0, 299.9)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setSingleStep(0.1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setDecimals(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setValue(initstats["crange"][0])
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmax"] = QDoubleSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setRange(0.1, 300)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setSingleStep(0.1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setDecimals(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setValue(initstats["crange"][1])
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmintitle"] = QLabel("Frequency Min (Hz): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmintitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmaxtitle"] = QLabel("Frequency Max (Hz): ")
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmaxtitle"].setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmin"] = QSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setRange(0, 49999)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setSingleStep(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setValue(initstats["frange"][0])
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmax"] = QSpinBox() 
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setRange(0, 50000)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setSingleStep(1)
-            self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setValue(initstats["frange"][1])
-            
-            
-            self.alltabdata[curtabnum]["tabwidgets"]["savespectro"].setChecked(True)
-            self.updatesavespectrobox(True)
-            self.alltabdata[curtabnum]["tabwidgets"]["savesubset"].setChecked(False)
-            self.updatesavesubsetbox(False)
-            
-            
-            
-            widgetorder = ["savetitle", "saveaudio", "savespectro", "savefile",     "timerangetitle", "savesubset", "starttimetitle", "starttime", "endtimetitle", "endtime",     "spectrosettingstitle", "savecmintitle", "savecmin", "savecmaxtitle", "savecmax", "savefmintitle", "savefmin", "savefmaxtitle", "savefmax",]
-            wrows     = [1,2,3,4,  1,2,3,3,4,4,  1,2,2,3,3,4,4,5,5]
-            wcols     = [1,1,1,1,  3,3,3,4,3,4,  6,6,7,6,7,6,7,6,7]
-            wrext     = [1,1,1,1,  1,1,1,1,1,1,  1,1,1,1,1,1,1,1,1]
-            wcolext   = [1,1,1,1,  2,2,1,1,1,1,  2,1,1,1,1,1,1,1,1]
-    
-            #adding user inputs
-            for i,r,c,re,ce in zip(widgetorder,wrows,wcols,wrext,wcolext):
-                self.alltabdata[curtabnum]["plotsavelayout"].addWidget(self.alltabdata[curtabnum]["tabwidgets"][i],r,c,re,ce)
-    
-            #adjusting stretch factors for all rows/columns
-            colstretch = [6,4,1,2,2,1,2,2,6]
-            for col,cstr in zip(range(0,len(colstretch)),colstretch):
-                self.alltabdata[curtabnum]["plotsavelayout"].setColumnStretch(col,cstr)
-            rowstretch = [3,1,1,1,1,1,5]
-            for row,rstr in zip(range(0,len(rowstretch)),rowstretch):
-                self.alltabdata[curtabnum]["plotsavelayout"].setRowStretch(row,rstr)
                 
-            
-
-            ##making the current layout for the tab
-            self.alltabdata[curtabnum]["tab"].setLayout(self.alltabdata[curtabnum]["mainLayout"])
+    def buildplotsavetab(self, curtabnum):
+        
+        td = self.alltabdata[curtabnum]
+        tw = td.tabwidgets
+        stats = td.stats
+        
+        #making widgets for file saving tab (all created at once in a single dict literal)
+        tw.update({
+            "savetitle":QLabel("Save: "),
+            "saveaudio":QCheckBox('Save audio (WAV) file'),
+            "savespectro":QCheckBox('Save spectrogram'),
+            "savefile":QPushButton('Save File(s)'),
+            "savetimerangetitle":QLabel("Time range to save:"),
+            "savesubset":QCheckBox('Save subset'),
+            "starttimetitle":QLabel("Start Time: "),
+            "starttime":self.makedoublespinbox(0, 0, 0.05, 2, 0),
+            "endtimetitle":QLabel("End Time: "),
+            "endtime":self.makedoublespinbox(0, 0, 0.05, 2, 0),
+            "spectrosettingstitle":QLabel("Spectrogram Settings: "),
+            "savecmintitle":QLabel("Color Min: "),
+            "savecmaxtitle":QLabel("Color Max: "),
+            "savecmin":self.makedoublespinbox(0.0, 299.9, 0.1, 1, stats["crange"][0]),
+            "savecmax":self.makedoublespinbox(0.1, 300, 0.1, 1, stats["crange"][1]),
+            "savefmintitle":QLabel("Frequency Min (Hz): "),
+            "savefmaxtitle":QLabel("Frequency Max (Hz): "),
+            "savefmin":self.makeintspinbox(0, 49999, 1, stats["frange"][0]),
+            "savefmax":self.makeintspinbox(0, 50000, 1, stats["frange"][1])})
+        
+        tw["starttimetitle"].setAlignment(_RIGHT_V)
+        tw["endtimetitle"].setAlignment(_RIGHT_V)
+        tw["savecmintitle"].setAlignment(_RIGHT_V)
+        tw["savecmaxtitle"].setAlignment(_RIGHT_V)
+        tw["savefmintitle"].setAlignment(_RIGHT_V)
+        tw["savefmaxtitle"].setAlignment(_RIGHT_V)
+        
+        #limiting save frequency range to nyquist frequency (if it is known)
+        if stats["updated"]:
+            maxF = int(np.ceil(stats["fs"]/2))
+            tw["savefmin"].setRange(0, maxF-1)
+            tw["savefmax"].setRange(0, maxF)
+        
+        #setting save time ranges (this tab is only enabled/built after processing finishes)
+        maxval = np.round(td.data["maxtime"]*20)/20
+        tw["starttime"].setRange(0, maxval-0.5)
+        tw["starttime"].setValue(0)
+        tw["endtime"].setRange(0, maxval)
+        tw["endtime"].setValue(maxval)
+        
+        #adding user inputs (updates suspended so the grid is only laid out once)
+        td.plotsavewidget.setUpdatesEnabled(False)
+        addwidget = td.plotsavelayout.addWidget
+        for i,r,c,re,ce in _SAVE_LAYOUT:
+            addwidget(tw[i],r,c,re,ce)
 
-        except Exception: #if something breaks
-            trace_error()
-            self.posterror("Failed to build new tab")
+        #adjusting stretch factors for all rows/columns
+        for col,cstr in enumerate(_SAVE_COLSTRETCH):
+            td.plotsavelayout.setColumnStretch(col,cstr)
+        for row,rstr in enumerate(_SAVE_ROWSTRETCH):
+            td.plotsavelayout.setRowStretch(row,rstr)
+        td.plotsavewidget.setUpdatesEnabled(True)
+        td.plotsavelayout.activate()
+        
+        #connecting signals and setting initial checkbox states once all widgets are in place
+        tw["savespectro"].clicked.connect(self.updatesavespectrobox)
+        tw["savefile"].clicked.connect(self.savefiles)
+        tw["savesubset"].clicked.connect(self.updatesavesubsetbox)
+        tw["saveaudio"].setChecked(True)
+        tw["savespectro"].setChecked(True)
+        self.updatesavespectrobox(True)
+        tw["savesubset"].setChecked(False)
+        self.updatesavesubsetbox(False)
+        
+        td.plotsavebuilt = True
         
             
     
@@ -478,8 +550,8 @@ class RunProgram(QMainWindow):
 # =============================================================================
 
     def getspecs(self):
-        curtabnum,_ = self.whatTab()
-        stats = self.alltabdata[curtabnum]["stats"]
+        curtabnum = self.tabWidget.currentIndex()
+        stats = self.alltabdata[curtabnum].stats
         
         fsnunits = "Hz"
         
@@ -503,118 +575,149 @@ class RunProgram(QMainWindow):
         
 
     def updatecurtabsettings(self):
-        curtabnum,_ = self.whatTab()
+        curtabnum = self.tabWidget.currentIndex()
         self.pullsettings(curtabnum,True)
         
         
         
     def pullsettings(self,curtabnum, updateProcessor):        
-        oldrange = self.alltabdata[curtabnum]["stats"]["timerange"]
-        self.alltabdata[curtabnum]["stats"]["timerange"] = self.alltabdata[curtabnum]["tabwidgets"]["timerange"].value()
-        
-        oldcrange = self.alltabdata[curtabnum]["stats"]["crange"]
-        self.alltabdata[curtabnum]["stats"]["crange"] = [self.alltabdata[curtabnum]["tabwidgets"]["cmin"].value(), self.alltabdata[curtabnum]["tabwidgets"]["cmax"].value()]
-        if self.alltabdata[curtabnum]["stats"]["crange"][1] <= self.alltabdata[curtabnum]["stats"]["crange"][0]:
-            self.alltabdata[curtabnum]["stats"]["crange"] = oldcrange
-            self.alltabdata[curtabnum]["tabwidgets"]["cmin"].setValue(oldcrange[0])
-            self.alltabdata[curtabnum]["tabwidgets"]["cmax"].setValue(oldcrange[1])
+        td = self.alltabdata[curtabnum]
+        stats = td.stats
+        tw = td.tabwidgets
+        
+        oldrange = stats["timerange"]
+        stats["timerange"] = tw["timerange"].value()
+        
+        oldcrange = stats["crange"]
+        stats["crange"] = [tw["cmin"].value(), tw["cmax"].value()]
+        if stats["crange"][1] <= stats["crange"][0]:
+            stats["crange"] = oldcrange
+            tw["cmin"].setValue(oldcrange[0])
+            tw["cmax"].setValue(oldcrange[1])
             self.postwarning("Maximum color range must exceed minimum value!")
             
-        oldfrange = self.alltabdata[curtabnum]["stats"]["frange"]
-        self.alltabdata[curtabnum]["stats"]["frange"] = [self.alltabdata[curtabnum]["tabwidgets"]["fmin"].value(), self.alltabdata[curtabnum]["tabwidgets"]["fmax"].value()]
-        if self.alltabdata[curtabnum]["stats"]["frange"][1] <= self.alltabdata[curtabnum]["stats"]["frange"][0]:
-            self.alltabdata[curtabnum]["stats"]["frange"] = oldcrange
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setValue(oldfrange[0])
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setValue(oldfrange[1])
+        oldfrange = stats["frange"]
+        stats["frange"] = [tw["fmin"].value(), tw["fmax"].value()]
+        if stats["frange"][1] <= stats["frange"][0]:
+            stats["frange"] = oldfrange
+            tw["fmin"].setValue(oldfrange[0])
+            tw["fmax"].setValue(oldfrange[1])
             self.postwarning("Maximum frequency range must exceed minimum value!")
         
-        self.alltabdata[curtabnum]["stats"]["reprate"] = self.alltabdata[curtabnum]["tabwidgets"]["reprate"].value()
-        self.alltabdata[curtabnum]["stats"]["fftwindow"] = self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].value()
-        self.alltabdata[curtabnum]["stats"]["alpha"] = self.alltabdata[curtabnum]["tabwidgets"]["alpha"].value()
+        stats["reprate"] = tw["reprate"].value()
+        stats["fftwindow"] = tw["fftlen"].value()
+        stats["alpha"] = tw["alpha"].value()
                 
+        #redraws are queued (draw_idle) so axes + colorbar changes are rendered together, and skipped if nothing changed
         self.updateAxesLimits(curtabnum)
-        self.updatecolorbar(curtabnum,self.alltabdata[curtabnum]["stats"]["crange"])
+        if stats["crange"] != oldcrange:
+            self.updatecolorbar(curtabnum,stats["crange"])
             
-        if self.alltabdata[curtabnum]["isprocessing"] and updateProcessor:
-            self.alltabdata[curtabnum]["Processor"].changethresholds_slot(self.alltabdata[curtabnum]["stats"]["fftwindow"], self.alltabdata[curtabnum]["stats"]["reprate"], self.alltabdata[curtabnum]["stats"]["alpha"])
+        if td.isprocessing and updateProcessor:
+            td.Processor.changethresholds_slot(stats["fftwindow"], stats["reprate"], stats["alpha"])
             
         #updating QLabel with signal processing specs
         ctext = self.getspecs()
-        self.alltabdata[curtabnum]["tabwidgets"]["specs"].setText(ctext)
+        tw["specs"].setText(ctext)
         
-        #updating color and frequency ranges on save plot
-        self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setValue(self.alltabdata[curtabnum]["stats"]["crange"][0])
-        self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setValue(self.alltabdata[curtabnum]["stats"]["crange"][1])
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setValue(self.alltabdata[curtabnum]["stats"]["frange"][0])
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setValue(self.alltabdata[curtabnum]["stats"]["frange"][1])
+        #updating color and frequency ranges on save plot (if it has been built- otherwise they are pulled from stats when it is)
+        if td.plotsavebuilt:
+            tw["savecmin"].setValue(stats["crange"][0])
+            tw["savecmax"].setValue(stats["crange"][1])
+            tw["savefmin"].setValue(stats["frange"][0])
+            tw["savefmax"].setValue(stats["frange"][1])
         
         
         
     @pyqtSlot(int,int,float,int,np.ndarray)
     def updatesettingsfromprocessor(self,tabID,fs,df,N,freqs): #TODO: SORT OUT FMIN AND FMAX STUFF + FREQUENCY TRIMMING!!!
-        curtabnum = self.tabnumbers.index(tabID)
-        self.alltabdata[curtabnum]["stats"]["updated"] = True
-        self.alltabdata[curtabnum]["stats"]["fs"] = fs
-        self.alltabdata[curtabnum]["stats"]["N"] = N
-        self.alltabdata[curtabnum]["stats"]["df"] = df
-        self.alltabdata[curtabnum]["stats"]["freqs"] = freqs
-        self.alltabdata[curtabnum]["data"]["freqs"] = freqs
+        if tabID not in self.tabindices: #tab was closed- signal was queued before its processor stopped
+            return
+        curtabnum = self.tabindices[tabID]
+        td = self.alltabdata[curtabnum]
+        stats = td.stats
+        tw = td.tabwidgets
+        data = td.data
+        stats["updated"] = True
+        stats["fs"] = fs
+        stats["N"] = N
+        stats["df"] = df
+        stats["freqs"] = freqs
+        data["freqs"] = freqs
         
         maxF = int(np.ceil(fs/2))
-        self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setRange(0, maxF-1)
-        self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setRange(0, maxF)
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setRange(0, maxF-1)
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setRange(0, maxF)
-        if self.alltabdata[curtabnum]["stats"]["frange"][0] >= maxF:
-            self.alltabdata[curtabnum]["stats"]["frange"][0] = 0
-            self.alltabdata[curtabnum]["tabwidgets"]["fmin"].setValue(0)
-        if self.alltabdata[curtabnum]["stats"]["frange"][1] > maxF:
-            self.alltabdata[curtabnum]["stats"]["frange"][1] = maxF
-            self.alltabdata[curtabnum]["tabwidgets"]["fmax"].setValue(maxF)
-        cfrange = self.alltabdata[curtabnum]["stats"]["frange"]
-        
-        keepvals = np.all((np.greater_equal(freqs,cfrange[0]),np.less_equal(freqs,cfrange[1])),axis=0)
-        freqs = freqs[keepvals]
-        inds = np.argwhere(keepvals)
-        fscale = int(np.ceil(len(freqs)/self.maxNfreqs))
-        self.alltabdata[curtabnum]["stats"]["fscale"]  = fscale
-        relplotindices = range(int(np.floor(fscale/2)),len(freqs),fscale)
-        self.alltabdata[curtabnum]["stats"]["plotindices"] = [inds[i] for i in relplotindices]
-        self.alltabdata[curtabnum]["data"]["plotfreqs"] = [freqs[i] for i in relplotindices]
+        tw["fmin"].setRange(0, maxF-1)
+        tw["fmax"].setRange(0, maxF)
+        if td.plotsavebuilt:
+            tw["savefmin"].setRange(0, maxF-1)
+            tw["savefmax"].setRange(0, maxF)
+        if stats["frange"][0] >= maxF:
+            stats["frange"][0] = 0
+            tw["fmin"].setValue(0)
+        if stats["frange"][1] > maxF:
+            stats["frange"][1] = maxF
+            tw["fmax"].setValue(maxF)
+        cfrange = stats["frange"]
+        
+        #plotted frequencies only depend on the frequency range and FFT settings- skip the trim if none changed
+        frangekey = (cfrange[0], cfrange[1], fs, N)
+        if frangekey != stats["frangekey"] or stats["plotindices"] is None:
+            stats["frangekey"] = frangekey
+            inds = np.flatnonzero((freqs >= cfrange[0]) & (freqs <= cfrange[1]))
+            if inds.size == 0: #range narrower than the (pooled) bin spacing- plot the bin nearest its center
+                inds = np.array([np.argmin(np.abs(freqs - (cfrange[0] + cfrange[1])/2))])
+            fscale = max(1, int(np.ceil(inds.size/self.maxNfreqs)))
+            stats["fscale"]  = fscale
+            plotindices = inds[fscale//2::fscale]
+            stats["plotindices"] = plotindices
+            data["plotfreqs"] = freqs[plotindices]
+            if data["isplotted"] is not None: #plotted frequencies changed- redo all columns
+                data["isplotted"][:] = False
         
         self.pullsettings(curtabnum, False) #dont update processor to prevent recursion
         
         
         
         
+    #reads spectrogram colors from file and builds colormap (called once at startup)
+    def loadspectralcolormap(self):
+        cdata = np.loadtxt('spectralcolors.txt',delimiter=',',dtype=np.float32)
+        npoints = cdata.shape[0] #number of colors
+        self.spectralmap = ListedColormap(np.append(cdata, np.ones((npoints, 1), dtype=np.float32), axis=1))
+        
+        
     def gencolorbar(self,curtabnum,crange):
         
-        self.cdata = np.genfromtxt('spectralcolors.txt',delimiter=',')
-        self.npoints = self.cdata.shape[0] #number of colors
-        self.spectralmap = ListedColormap(np.append(self.cdata, np.ones((np.shape(self.cdata)[0], 1)), axis=1))
-        cbar_cm_object = self.buildspectrogramcolorbar(self.spectralmap, crange, self.alltabdata[curtabnum]["SpectroFig"], self.alltabdata[curtabnum]["SpectroAxes"])
-        self.alltabdata[curtabnum]["SpectroCanvas"].draw()
-        self.levels = np.linspace(crange[0],crange[1],self.npoints)
+        cbar_cm_object = self.buildspectrogramcolorbar(self.spectralmap, crange, self.alltabdata[curtabnum].SpectroFig, self.alltabdata[curtabnum].SpectroAxes)
+        self.alltabdata[curtabnum].SpectroCanvas.draw_idle()
         
         return cbar_cm_object
         
         
         
     def updatecolorbar(self,curtabnum,crange):
-        self.alltabdata[curtabnum]["colorbar"].set_clim(crange[0],crange[1])
-        self.levels = np.linspace(crange[0],crange[1],self.npoints)
-        self.alltabdata[curtabnum]["SpectroCanvas"].draw()
+        if self.alltabdata[curtabnum].colorbar is None: #not drawn yet- will be built with stats["crange"]
+            return
+        self.alltabdata[curtabnum].colorbar.set_clim(crange[0],crange[1])
+        if self.alltabdata[curtabnum].SpectroImage is not None:
+            self.alltabdata[curtabnum].SpectroImage.set_clim(crange[0],crange[1])
+        self.alltabdata[curtabnum].SpectroCanvas.draw_idle()
         
         
         
 
     def updateAxesLimits(self,curtabnum):
-        timerange = self.alltabdata[curtabnum]["stats"]["timerange"]
-        curlimit = self.alltabdata[curtabnum]["tabwidgets"]["ctime"].value()
-        frange = self.alltabdata[curtabnum]["stats"]["frange"]
-        self.alltabdata[curtabnum]["SpectroAxes"].set_xlim(curlimit - timerange,curlimit)
-        self.alltabdata[curtabnum]["SpectroAxes"].set_ylim(frange[0], frange[1])
-        self.alltabdata[curtabnum]["SpectroCanvas"].draw()
+        timerange = self.alltabdata[curtabnum].stats["timerange"]
+        curlimit = self.alltabdata[curtabnum].tabwidgets["ctime"].value()
+        frange = self.alltabdata[curtabnum].stats["frange"]
+        ax = self.alltabdata[curtabnum].SpectroAxes
+        if ax is None: #spectrogram failed to build for this tab
+            return
+        if tuple(ax.get_xlim()) == (curlimit - timerange,curlimit) and tuple(ax.get_ylim()) == (frange[0], frange[1]):
+            return #no visible change- skip redraw
+        ax.set_xlim(curlimit - timerange,curlimit)
+        ax.set_ylim(frange[0], frange[1])
+        self.alltabdata[curtabnum].SpectroCanvas.draw_idle()
         
         
         
@@ -626,21 +729,23 @@ class RunProgram(QMainWindow):
             
         else:
             curtabnum, tabID = self.whatTab()
+            td = self.alltabdata[curtabnum]
+            tw = td.tabwidgets
             self.pullsettings(curtabnum, False) #don't need to update processor because it hasn't been initialized yet
             
-            datasource = self.alltabdata[curtabnum]["tabwidgets"]["datasource"].currentText()
+            datasource = tw["datasource"].currentText()
             
             if datasource.lower() == "wav file": #AUDIO FILE            
                 # getting filename
                 fname, ok = QFileDialog.getOpenFileName(self, 'Open file',self.defaultfiledir,"Source Data Files (*.WAV *.Wav *.wav *PCM *Pcm *pcm)","",self.fileoptions)
                 if not ok or fname == "":
-                    self.alltabdata[curtabnum]["isprocessing"] = False
+                    td.isprocessing = False
                     return
                 else:
                     splitpath = path.split(fname)
                     self.defaultfiledir = splitpath[0]
                     
-                self.alltabdata[curtabnum]["fromAudio"] = True
+                td.fromAudio = True
                     
                 #determining which channel to use
                 #selec-2=no box opened, -1 = box opened, 0 = box closed w/t selection, > 0 = selected channel
@@ -652,8 +757,7 @@ class RunProgram(QMainWindow):
                     
                 nchannels = file_info.getnchannels()
                 if nchannels == 1:
-                    datasource = f"AAA-00000-{fname}"
-                    self.initiate_processor(tabID, datasource)
+                    self.initiate_processor(tabID, self.makeaudiodatasource(0, fname))
                 else:
                     if self.audioWindowOpened: #active tab already opened 
                         self.postwarning("An audio channel selector dialog box has already been opened in another tab. Please close that box before processing an audio file with multiple channels in this tab.")
@@ -668,171 +772,280 @@ class RunProgram(QMainWindow):
                         
                         
             else: #SPEAKER STREAM
-                dataindex = self.audiosourceIDs[self.alltabdata[curtabnum]["tabwidgets"]["datasource"].currentIndex()]
+                dataindex = self.audiosourceIDs[tw["datasource"].currentIndex()]
                 datasource = f"MMM-{dataindex}"
-                self.alltabdata[curtabnum]["fromAudio"] = False
+                td.fromAudio = False
                 self.initiate_processor(tabID, datasource)
                         
             
             
     #slot in main program to close window (only one channel selector window can be open at a time)
-    @pyqtSlot(int, int, str)
-    def audioWindowClosed(self, wasGood, tabID, datasource):
+    @pyqtSlot(int, int, int, str)
+    def audioWindowClosed(self, wasGood, tabID, channel, fname):
+        self.audioWindowOpened = False
         if wasGood:
-            self.audioWindowOpened = False
-            self.initiate_processor(tabID, datasource)
+            self.initiate_processor(tabID, self.makeaudiodatasource(channel, fname))
+            
+            
+    #builds AudioProcessor datasource for an audio file: AAA-<channel>-<filename> e.g. AAA-00002-/My/File.WAV
+    #allowing for 5-digit channels since WAV file channel is a 16-bit integer, can go to 65,536 (channel 0 = single-channel file)
+    def makeaudiodatasource(self, channel, fname):
+        return "AAA-" + format(channel, "05d") + "-" + fname
         
                         
         
     def initiate_processor(self, tabID, datasource):
         
-        curtabnum = self.tabnumbers.index(tabID)
+        curtabnum = self.tabindices[tabID]
+        td = self.alltabdata[curtabnum]
+        stats = td.stats
+        tw = td.tabwidgets
         
         #making datasource QComboBox un-selectable so source can't be changed after processing initiated
-        self.alltabdata[curtabnum]["tabwidgets"]["datasource"].setEnabled(False)
-        self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setEnabled(False)
-        self.alltabdata[curtabnum]["tabwidgets"]["fftlen"].setEnabled(False)
-        self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setEnabled(False)
+        tw["datasource"].setEnabled(False)
+        tw["ctime"].setEnabled(False)
+        tw["fftlen"].setEnabled(False)
+        tw["ctime"].setEnabled(False)
         
         #data relevant for thread
         starttime = datetime.utcnow()
-        fftwindow = self.alltabdata[curtabnum]["stats"]["fftwindow"]
-        dt = self.alltabdata[curtabnum]["stats"]["reprate"]
-        alpha = self.alltabdata[curtabnum]["stats"]["alpha"]
+        fftwindow = stats["fftwindow"]
+        dt = stats["reprate"]
+        alpha = stats["alpha"]
         
-        self.alltabdata[curtabnum]["stats"]["updateint"] = int(np.ceil(1/dt)) #updates visual once every second for live audio
+        stats["updateint"] = int(np.ceil(1/dt)) #updates visual once every second for live audio
         
         #saving datasource
-        self.alltabdata[curtabnum]["datasource"] = datasource
+        td.datasource = datasource
         
         #setting up progress bar for audio
         if datasource[:3].lower() == "aaa":
-            self.alltabdata[curtabnum]["tabwidgets"]["audioprogressbar"] = QProgressBar()
-            self.alltabdata[curtabnum]["mainLayout"].addWidget(
-                self.alltabdata[curtabnum]["tabwidgets"]["audioprogressbar"], 0,1,1,1)
-            self.alltabdata[curtabnum]["tabwidgets"]["audioprogressbar"].setValue(0)
+            tw["audioprogressbar"] = QProgressBar()
+            td.mainLayout.addWidget(tw["audioprogressbar"], 0,1,1,1)
+            tw["audioprogressbar"].setValue(0)
             QApplication.processEvents()
         
         #initializing and starting thread
-        self.alltabdata[curtabnum]["Processor"] = AP.AudioProcessor(self.PyAudioObject, datasource, self.tempdir, self.slash, tabID, starttime, fftwindow, dt, alpha)
-        self.threadpool.start(self.alltabdata[curtabnum]["Processor"])
+        td.Processor = AP.AudioProcessor(self.PyAudioObject, datasource, self.tempdir, self.slash, tabID, starttime, fftwindow, dt, alpha, maxNfreqs=self.maxemitfreqs)
+        self.threadpool.start(td.Processor)
+        self.anytempfiles = True
+        self.tempfiles.add(td.Processor.wavfilename)
         
         #connecting slots
-        self.alltabdata[curtabnum]["Processor"].signals.iterated.connect(self.updateUIinfo)
-        self.alltabdata[curtabnum]["Processor"].signals.statsupdated.connect(self.updatesettingsfromprocessor)
-        self.alltabdata[curtabnum]["Processor"].signals.terminated.connect(self.updateUIfinal)
-        self.alltabdata[curtabnum]["isprocessing"] = True
-        self.alltabdata[curtabnum]["tabwidgets"]["start"].setEnabled(False)
+        td.Processor.signals.iterated.connect(self.updateUIinfo)
+        td.Processor.signals.statsupdated.connect(self.updatesettingsfromprocessor)
+        td.Processor.signals.terminated.connect(self.updateUIfinal)
+        td.isprocessing = True
+        self.nprocessing += 1
+        tw["start"].setEnabled(False)
         
         
     def stopprocessor(self):
-        curtabnum,_ = self.whatTab()
-        if self.alltabdata[curtabnum]["isprocessing"]:
-            self.alltabdata[curtabnum]["Processor"].abort()
-            self.alltabdata[curtabnum]["isprocessing"] = False   
+        curtabnum = self.tabWidget.currentIndex()
+        if self.alltabdata[curtabnum].isprocessing:
+            self.alltabdata[curtabnum].isprocessing = False #cleared before abort() so updateUIfinal doesn't count the stop twice
+            self.nprocessing -= 1
+            self.alltabdata[curtabnum].Processor.abort()   
             
         
-    def append_spectral_data(self, mainspectra, newspectra, trimData, fsc, inds):
         
-        #trimming new spectra
-        if trimData:
-            lenspec = len(newspectra)
-            newspectra_cut = np.array([])
-            for i in inds:
-                sind = int(np.max([0, i-fsc]))
-                eind = int(np.min([lenspec, i+fsc]))
-                newspectra_cut = np.append(newspectra_cut, np.max(newspectra[sind:eind]))
-        else:
-            newspectra_cut = newspectra
         
-        if mainspectra.shape == (1,0):
-            output = np.rot90(np.array([newspectra_cut]),1)
-        else:
-            output = np.append(mainspectra,np.rot90(np.array([newspectra_cut]),1),axis=1)
-        return output
+        
+    #stores spectrum/time as the next column of the tab's spectrogram buffers (capacity doubles when full)
+    def storespectrum(self, data, ctime, newspectra):
+        ncols = data["ncols"]
+        if data["spectra"] is None: #first spectrum
+            data["spectra"] = np.empty((len(newspectra), self.spectrabufferlen), dtype=np.float32)
+            data["times"] = np.empty(self.spectrabufferlen)
+            data["isplotted"] = np.zeros(self.spectrabufferlen, dtype=bool)
+        elif ncols == data["spectra"].shape[1]: 
+            spectra = np.empty((data["spectra"].shape[0], 2*ncols), dtype=np.float32)
+            spectra[:,:ncols] = data["spectra"]
+            data["spectra"] = spectra
+            times = np.empty(2*ncols)
+            times[:ncols] = data["times"]
+            data["times"] = times
+            isplotted = np.zeros(2*ncols, dtype=bool)
+            isplotted[:ncols] = data["isplotted"]
+            data["isplotted"] = isplotted
+            
+        data["spectra"][:,ncols] = newspectra
+        data["times"][ncols] = ctime
+        data["ncols"] = ncols + 1
         
         
         
     @pyqtSlot(int,int,int,float,np.ndarray)
     def updateUIinfo(self,i,maxnum,tabID,ctime,spectra): #TODO: configure PyQtSlot to receive data from processor thread and update spectrogram
-        curtabnum = self.tabnumbers.index(tabID)
-        if self.alltabdata[curtabnum]["fromAudio"]: #from audio file
-            self.alltabdata[curtabnum]["tabwidgets"]["audioprogressbar"].setValue(int(np.round(100*i/maxnum)))
+        if tabID not in self.tabindices: #tab was closed- signal was queued before its processor stopped
+            return
+        curtabnum = self.tabindices[tabID]
+        td = self.alltabdata[curtabnum]
+        stats = td.stats
+        tw = td.tabwidgets
+        data = td.data
+        if td.fromAudio: #from audio file
+            tw["audioprogressbar"].setValue(int(np.round(100*i/maxnum)))
         
         #saving data
-        self.alltabdata[curtabnum]["data"]["maxtime"] = ctime
-        self.alltabdata[curtabnum]["data"]["ctime"] = ctime
-        self.alltabdata[curtabnum]["data"]["spectra"] = self.append_spectral_data(self.alltabdata[curtabnum]["data"]["spectra"], spectra, False, None, None)
-        self.alltabdata[curtabnum]["data"]["times"] = np.append(self.alltabdata[curtabnum]["data"]["times"], ctime)
-        self.alltabdata[curtabnum]["data"]["isplotted"].append(False)
+        data["maxtime"] = ctime
+        data["ctime"] = ctime
+        self.storespectrum(data, ctime, spectra.astype(np.float32, copy=False))
         
         #update spectrogram every 5 points for realtime or 50 points for audio (should be every 1 sec for a 10Hz reprate)
-        if (maxnum == 0 and i%self.alltabdata[curtabnum]["stats"]["updateint"]==0) or (maxnum > 0 and i%10==0):
+        if (maxnum == 0 and i%stats["updateint"]==0) or (maxnum > 0 and i%10==0):
             self.updateplot(curtabnum)
     
             
     
     
+    #sends spectra that haven't been plotted yet to a PlotPrepWorker for trimming (one worker in flight per tab)
     def updateplot(self,curtabnum):
-        if self.alltabdata[curtabnum]["data"]["isplotted"].count(False) >= 3:
-            
-            whatplot = [not x for x in self.alltabdata[curtabnum]["data"]["isplotted"]] #indices to plot
-            crange = self.alltabdata[curtabnum]["stats"]["crange"]
-            
-            freqs = self.alltabdata[curtabnum]["data"]["plotfreqs"] #pulling data to plot
-            fsc = int(np.ceil(self.alltabdata[curtabnum]["stats"]["fscale"]/2))
-            inds = self.alltabdata[curtabnum]["stats"]["plotindices"]
-            times = np.array([])
-            plotspectra = np.array([[]])
-            plotted = []
-            for (i,needsplotted) in enumerate(whatplot):
-                if needsplotted:
-                    plotspectra = self.append_spectral_data(plotspectra, self.alltabdata[curtabnum]["data"]["spectra"][:,i], True, fsc, inds)
-                    times = np.append(times,self.alltabdata[curtabnum]["data"]["times"][i])
-                    plotted.append(i)
-                    
-            del plotted[-1] #last point needs replotted to ensure no gaps in the spectrogram
+        td = self.alltabdata[curtabnum]
+        data = td.data
+        if td.plotpending: #result from the previous worker is applied first, then this update is rerun
+            td.plotrequested = True
+            return
+            
+        ncols = data["ncols"]
+        if ncols and ncols - np.count_nonzero(data["isplotted"][:ncols]) >= 3:
+            
+            whatplot = ~data["isplotted"][:ncols] #columns to plot
+            inds = td.stats["plotindices"]
+            if data["plotspectra"] is None or data["plotspectra"].shape[0] != len(inds): #number of plotted frequencies changed
+                whatplot[:] = True
+            cols = np.flatnonzero(whatplot)
+            
+            #worker gets its own copy of the columns, so the buffers can keep growing while it runs
+            worker = PlotPrepWorker(td.tabnum, data["spectra"][:,cols], cols, inds, int(np.ceil(td.stats["fscale"]/2)))
+            worker.signals.prepared.connect(self.plotprepared)
+            data["isplotted"][:ncols] = True
+            td.plotpending = True
+            self.plotthreadpool.start(worker)
+            
+            
+    #sets a tab's spectrogram image to the plotted columns within the current time limits (plus half the visible window
+    #on each side), so colormapping on every draw scales with the visible window rather than the length of the recording
+    def refreshspectroimage(self, curtabnum):
+        td = self.alltabdata[curtabnum]
+        data = td.data
+        nplotted = data["nplotted"]
+        plotspectra = data["plotspectra"]
+        if td.SpectroImage is None or nplotted == 0 or plotspectra.shape[0] != len(data["plotfreqs"]):
+            return #nothing plotted yet, or plotted frequencies changed and columns are being redone
+            
+        times = data["times"][:nplotted]
+        xmin, xmax = td.SpectroAxes.get_xlim()
+        margin = 0.5*(xmax - xmin)
+        i0 = min(max(int(np.searchsorted(times, xmin - margin)) - 1, 0), nplotted - 1) #one column past each edge so
+        i1 = max(min(int(np.searchsorted(times, xmax + margin, side="right")) + 1, nplotted), i0 + 1) #pixels reach the border
+        if data["imageslice"] == (i0, i1):
+            return
+        data["imageslice"] = (i0, i1)
+        freqs = data["plotfreqs"]
+        td.SpectroImage.set_data(times[i0:i1], freqs, plotspectra[:,i0:i1])
+        
+        #NonUniformImage fills the whole axes with the nearest column, so it is clipped to the stored data (half a column/row
+        #past the outermost ones) to leave times with no data (e.g. before recording started) blank
+        halfdt = 0.5*(times[-1] - times[0])/(nplotted - 1) if nplotted > 1 else 0.5*td.stats["reprate"]
+        halfdf = 0.5*(freqs[-1] - freqs[0])/(len(freqs) - 1) if len(freqs) > 1 else 0.5*td.stats["df"]
+        x0, y0 = times[i0] - halfdt, freqs[0] - halfdf
+        td.SpectroImage.set_clip_path(Rectangle((x0, y0), times[i1-1] + halfdt - x0, freqs[-1] + halfdf - y0, transform=td.SpectroAxes.transData))
+        
+        
+    #refreshes the visible spectrogram columns whenever a tab's time limits change (settings, new data, or toolbar pan/zoom)
+    def spectroxlimchanged(self, tabID):
+        if tabID in self.tabindices:
+            self.refreshspectroimage(self.tabindices[tabID])
+            
+            
+    #applies trimmed spectra from a PlotPrepWorker to the tab's plot buffer and updates its spectrogram image
+    @pyqtSlot(int, object, object, object)
+    def plotprepared(self, tabID, cols, trimmed, inds):
+        if tabID not in self.tabindices: #tab was closed while the worker was running
+            return
+        curtabnum = self.tabindices[tabID]
+        td = self.alltabdata[curtabnum]
+        stats = td.stats
+        data = td.data
+        td.plotpending = False
+        
+        if trimmed is None: #worker failed- columns are retried on the next update
+            data["isplotted"][cols] = False
+            
+        elif len(inds) != len(stats["plotindices"]) or not np.array_equal(inds, stats["plotindices"]):
+            td.plotrequested = True #plotted frequencies changed while the worker was running- redo with the new ones
             
-            dy = self.alltabdata[curtabnum]["stats"]["df"]/2
-            dx = self.alltabdata[curtabnum]["stats"]["reprate"]/2
-            extent = [times[0]-dx, times[-1]+dx, freqs[0]-dy, freqs[-1]+dy]
-            self.alltabdata[curtabnum]["SpectroAxes"].imshow(plotspectra, aspect="auto", cmap=self.spectralmap, vmin=crange[0], vmax=crange[1], extent=extent)
-            self.alltabdata[curtabnum]["SpectroAxes"].set_ylim(freqs[0],freqs[-1])
-            ctime = self.alltabdata[curtabnum]["data"]["ctime"]
-            timerange = self.alltabdata[curtabnum]["stats"]["timerange"]
-            self.alltabdata[curtabnum]["SpectroAxes"].set_xlim(ctime-timerange,ctime)
-            self.alltabdata[curtabnum]["SpectroCanvas"].draw()
-            
-            for i in plotted:
-                self.alltabdata[curtabnum]["data"]["isplotted"][i] = True
+        else:
+            #trimmed spectra for plotting are kept in a buffer parallel to data["spectra"]
+            plotspectra = data["plotspectra"]
+            nrows, capacity = len(inds), data["spectra"].shape[1]
+            if plotspectra is None or plotspectra.shape[0] != nrows: #first plot or number of plotted frequencies changed
+                plotspectra = data["plotspectra"] = np.empty((nrows, capacity), dtype=data["spectra"].dtype)
+            elif plotspectra.shape[1] < capacity: #spectra buffer has grown
+                newplotspectra = np.empty((nrows, capacity), dtype=plotspectra.dtype)
+                newplotspectra[:,:plotspectra.shape[1]] = plotspectra
+                plotspectra = data["plotspectra"] = newplotspectra
+            plotspectra[:,cols] = trimmed
+            data["nplotted"] = cols[-1] + 1 #all earlier columns were plotted before the worker was started
+            
+            if td.SpectroAxes is not None: #skipped if the spectrogram failed to build for this tab (data is still kept for saving)
+                #updating the tab's spectrogram image in place (pixel centers at the stored times/plotted frequencies)
+                freqs = data["plotfreqs"]
+                crange = stats["crange"]
+                image = td.SpectroImage
+                if image is None:
+                    image = NonUniformImage(td.SpectroAxes, interpolation="nearest", cmap=self.spectralmap)
+                    td.SpectroAxes.add_image(image)
+                    td.SpectroImage = image
+                image.set_clim(crange[0],crange[1])
+                td.SpectroAxes.set_ylim(freqs[0],freqs[-1])
+                data["imageslice"] = None #image contents changed- slice must be reapplied even if the visible columns didn't move
+                ctime = data["ctime"]
+                timerange = stats["timerange"]
+                td.SpectroAxes.set_xlim(ctime-timerange,ctime)
+                self.refreshspectroimage(curtabnum)
+                td.SpectroCanvas.draw_idle()
+            
+        if td.plotrequested:
+            td.plotrequested = False
+            self.updateplot(curtabnum)
             
                 
         
     
     @pyqtSlot(int,int)
     def updateUIfinal(self,tabID,reason): #TODO: final plot update (error codes, etc)
-        curtabnum = self.tabnumbers.index(tabID)
+        if tabID not in self.tabindices: #tab was closed- signal was queued before its processor stopped
+            return
+        curtabnum = self.tabindices[tabID]
+        td = self.alltabdata[curtabnum]
+        tw = td.tabwidgets
+        data = td.data
         curtabname = self.tabWidget.tabText(curtabnum)
         
-        self.alltabdata[curtabnum]["isprocessing"] = False
+        if td.isprocessing:
+            td.isprocessing = False
+            self.nprocessing -= 1
         self.updateplot(curtabnum)
         
-        maxval = np.round(self.alltabdata[curtabnum]["data"]["maxtime"]*20)/20
+        maxval = np.round(data["maxtime"]*20)/20
         
-        self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setEnabled(True)
-        self.alltabdata[curtabnum]["data"]["ctime"] = self.alltabdata[curtabnum]["data"]["maxtime"]
-        self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setRange(0, maxval)
-        self.alltabdata[curtabnum]["tabwidgets"]["ctime"].setValue(maxval)
+        tw["ctime"].setEnabled(True)
+        data["ctime"] = data["maxtime"]
+        tw["ctime"].setRange(0, maxval)
+        tw["ctime"].setValue(maxval)
         
-        self.alltabdata[curtabnum]["tabwidget"].setTabEnabled(1,True)
-        self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setRange(0, maxval-0.5)
-        self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setValue(0)
-        self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setRange(0, maxval)
-        self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setValue(maxval)
+        td.tabwidget.setTabEnabled(1,True)
+        if td.plotsavebuilt:
+            tw["starttime"].setRange(0, maxval-0.5)
+            tw["starttime"].setValue(0)
+            tw["endtime"].setRange(0, maxval)
+            tw["endtime"].setValue(maxval)
         
         
-        if self.alltabdata[curtabnum]["fromAudio"]:
-            self.alltabdata[curtabnum]["tabwidgets"]["audioprogressbar"].deleteLater()
+        if td.fromAudio:
+            tw["audioprogressbar"].deleteLater()
         
         if reason:
             if reason == 1:
@@ -868,16 +1081,16 @@ class RunProgram(QMainWindow):
 # =============================================================================      
         
     def updatesavespectrobox(self,isChecked): 
-        curtabnum,_ = self.whatTab()
-        self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].setEnabled(isChecked)
-        self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].setEnabled(isChecked)
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].setEnabled(isChecked)
-        self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].setEnabled(isChecked)
+        curtabnum = self.tabWidget.currentIndex()
+        self.alltabdata[curtabnum].tabwidgets["savecmin"].setEnabled(isChecked)
+        self.alltabdata[curtabnum].tabwidgets["savecmax"].setEnabled(isChecked)
+        self.alltabdata[curtabnum].tabwidgets["savefmin"].setEnabled(isChecked)
+        self.alltabdata[curtabnum].tabwidgets["savefmax"].setEnabled(isChecked)
         
     def updatesavesubsetbox(self, isChecked):
-        curtabnum,_ = self.whatTab()
-        self.alltabdata[curtabnum]["tabwidgets"]["starttime"].setEnabled(isChecked)
-        self.alltabdata[curtabnum]["tabwidgets"]["endtime"].setEnabled(isChecked)  
+        curtabnum = self.tabWidget.currentIndex()
+        self.alltabdata[curtabnum].tabwidgets["starttime"].setEnabled(isChecked)
+        self.alltabdata[curtabnum].tabwidgets["endtime"].setEnabled(isChecked)  
         
         
         
@@ -886,17 +1099,17 @@ class RunProgram(QMainWindow):
         curtabnum,tabID = self.whatTab()
         
         #getting data
-        saveAudio = self.alltabdata[curtabnum]["tabwidgets"]["saveaudio"].isChecked()
-        saveSpectro = self.alltabdata[curtabnum]["tabwidgets"]["savespectro"].isChecked()
+        saveAudio = self.alltabdata[curtabnum].tabwidgets["saveaudio"].isChecked()
+        saveSpectro = self.alltabdata[curtabnum].tabwidgets["savespectro"].isChecked()
         
-        savesubset = self.alltabdata[curtabnum]["tabwidgets"]["savesubset"].isChecked()
+        savesubset = self.alltabdata[curtabnum].tabwidgets["savesubset"].isChecked()
         if savesubset:
-            timerange = [self.alltabdata[curtabnum]["tabwidgets"]["starttime"].value(), self.alltabdata[curtabnum]["tabwidgets"]["endtime"].value()]
+            timerange = [self.alltabdata[curtabnum].tabwidgets["starttime"].value(), self.alltabdata[curtabnum].tabwidgets["endtime"].value()]
         else:
-            timerange = [0, self.alltabdata[curtabnum]["data"]["maxtime"]]
+            timerange = [0, self.alltabdata[curtabnum].data["maxtime"]]
         
-        colorrange = [self.alltabdata[curtabnum]["tabwidgets"]["savecmin"].value(), self.alltabdata[curtabnum]["tabwidgets"]["savecmax"].value()]
-        freqrange = [self.alltabdata[curtabnum]["tabwidgets"]["savefmin"].value(), self.alltabdata[curtabnum]["tabwidgets"]["savefmax"].value()]
+        colorrange = [self.alltabdata[curtabnum].tabwidgets["savecmin"].value(), self.alltabdata[curtabnum].tabwidgets["savecmax"].value()]
+        freqrange = [self.alltabdata[curtabnum].tabwidgets["savefmin"].value(), self.alltabdata[curtabnum].tabwidgets["savefmax"].value()]
         
         if saveAudio:
             #file dialog box to save wav file
@@ -922,39 +1135,38 @@ class RunProgram(QMainWindow):
         if filename[-4:].lower() != ".wav":
             filename += ".wav"
         
-        origfilename = self.tempdir + self.slash +  "tempwav_" + str(tabID) + '.WAV'
+        origfilename = path.join(self.tempdir, "tempwav_" + str(tabID) + '.WAV')
                 
-        if savesubset: #only saving a subset of the file- 
-            fs, snd = sciwavfile.read(origfilename) #reading file
-            
-            #pulling pcm data for correct channel number (if datasource was audio)
-            cdatasource = self.alltabdata[curtabnum]["datasource"]
-            if cdatasource[:3].lower() == "aaa":
+        if savesubset: #only saving a subset of the file- only the requested frames are read from the temp file
+            with wave.open(origfilename,'rb') as src:
+                fs = src.getframerate()
+                nchannels = src.getnchannels()
+                sampwidth = src.getsampwidth()
+                
+                #trimming audiostream to only necessary data
+                sind = int(np.round(fs*timerange[0]))
+                eind = min(int(np.round(fs*timerange[1])), src.getnframes())
+                src.setpos(sind)
+                rawdata = src.readframes(max(eind - sind, 0))
+            
+            #pulling pcm data for correct channel number (if datasource was audio), frames are interleaved by channel
+            cdatasource = self.alltabdata[curtabnum].datasource
+            if cdatasource[:3].lower() == "aaa" and nchannels > 1:
                 chnum = int(cdatasource[4:9])
                 if chnum > 0:
-                    audiostream = snd[:, chnum-1]
-                else:
-                    audiostream = snd
-            else:
-                audiostream = snd
+                    rawdata = np.frombuffer(rawdata, dtype=np.uint8).reshape(-1, nchannels, sampwidth)[:, chnum-1, :].tobytes()
+                    nchannels = 1
             
-            #configuring wav file
-            wavfile = wave.open(filename,'wb')
-            wave.Wave_write.setnchannels(wavfile,1) #single channel output
-            wave.Wave_write.setsampwidth(wavfile,2) #sample size configured as int16
-            wave.Wave_write.setframerate(wavfile,fs)
-            
-            #trimming audiostream to only necessary data
-            sind = int(np.round(fs*timerange[0]))
-            eind = int(np.round(fs*timerange[1]))
-            
-            #writing pcm data to new wav file, closing
-            wave.Wave_write.writeframes(wavfile, bytearray(audiostream[sind:eind]))
-            wave.Wave_write.close(wavfile)
+            #writing pcm data to new wav file (same sample width as source), closing
+            with wave.open(filename,'wb') as wavfile:
+                wavfile.setnchannels(nchannels)
+                wavfile.setsampwidth(sampwidth)
+                wavfile.setframerate(fs)
+                wavfile.writeframes(rawdata)
             
             
         else: #saving the whole file- just copy the tempfile to specified directory
-            shutil.copy(origfilename, filename)
+            shcopy(origfilename, filename)
             #if savesubset == True, open temp wave file, trim data, resave to correct location
         
         
@@ -964,39 +1176,39 @@ class RunProgram(QMainWindow):
         
         
     def saveSpectroFile(self,filename,curtabnum,timerange,freqrange,colorrange):
+        data = self.alltabdata[curtabnum].data
         if filename[-4:].lower() != ".png":
             filename += ".png"
             
-        freqs = self.alltabdata[curtabnum]["data"]["freqs"] #pulling data to plot
-        times = self.alltabdata[curtabnum]["data"]["times"]
-        spectra = self.alltabdata[curtabnum]["data"]["spectra"]
-        
-        #trimming data
-        keepfreqs = np.all((np.greater_equal(freqs,freqrange[0]),np.less_equal(freqs,freqrange[1])),axis=0)
-        keeptimes = np.all((np.greater_equal(times,timerange[0]),np.less_equal(times,timerange[1])),axis=0)
-        freqs = freqs[keepfreqs]
-        times = times[keeptimes]
-        spectra = spectra[np.ix_(keepfreqs, keeptimes)]
-                
-        #calculating pixel extent for plt.imshow()
-        dy = self.alltabdata[curtabnum]["stats"]["df"]/2
-        dx = self.alltabdata[curtabnum]["stats"]["reprate"]/2
-        extent = [times[0]-dx, times[-1]+dx, freqs[0]-dy, freqs[-1]+dy]
+        freqs = data["freqs"] #pulling data to plot
+        spectra = data["spectra"]
+        if spectra is None: #no data recorded in this tab
+            self.postwarning("No spectrogram data available to save!")
+            return
+        ncols = data["ncols"] #buffers are preallocated, only the first ncols columns are filled
+        times = data["times"][:ncols]
+        spectra = spectra[:,:ncols]
+        
+        #trimming data (index arrays are built once and reused for the axes and the 2D gather)
+        freqinds = np.flatnonzero((freqs >= freqrange[0]) & (freqs <= freqrange[1]))
+        timeinds = np.flatnonzero((times >= timerange[0]) & (times <= timerange[1]))
+        freqs = freqs[freqinds]
+        times = times[timeinds]
+        spectra = spectra[np.ix_(freqinds, timeinds)]
         
         #making figure
-        fig = plt.figure()
-        fig.clear()
+        fig = Figure()
         fig.set_size_inches(8,4)
         ax = fig.add_axes([0.1,0.15,0.9,0.80])
         
         #adding colorbar to plot
         self.buildspectrogramcolorbar(self.spectralmap, colorrange, fig, ax)
         
-        #adding data to plot
-        spectra[spectra < colorrange[0]] = colorrange[0]
-        spectra[spectra > colorrange[1]] = colorrange[1]
-        levels = np.linspace(colorrange[0], colorrange[1], len(self.cdata))
-        ax.contourf(times, freqs, spectra, levels=levels, colors=self.cdata)
+        #adding data to plot (raster image with pixels centered on each time/frequency- values outside colorrange saturate)
+        image = NonUniformImage(ax, interpolation="nearest", cmap=self.spectralmap)
+        image.set_data(times, freqs, spectra)
+        image.set_clim(colorrange[0], colorrange[1])
+        ax.add_image(image)
         
         #formatting
         ax.set_xlabel('Time (s)')
@@ -1039,120 +1251,138 @@ class RunProgram(QMainWindow):
     def addnewtab(self):
         #creating numeric ID for newly opened tab
         self.totaltabs += 1
-        self.tabnumbers.append(self.totaltabs)
         newtabnum = self.tabWidget.count()
         return newtabnum
+        
+    #rebuilds tabID -> tab index lookup (called after a tab is closed, since later tabs shift down)
+    def rebuildtabindices(self):
+        self.tabindices = {td.tabnum:i for i,td in enumerate(self.alltabdata)}
 
     #gets index of open tab in GUI
     def whatTab(self):
-        curtabnum = self.tabWidget.currentIndex()
-        return curtabnum, self.tabnumbers[curtabnum]
+        return self.tabWidget.currentIndex(), self.tabWidget.currentWidget().property("tabID")
     
-    #renames tab (only user-visible name, not self.alltabdata dict key)
+    #renames tab (only user-visible name, not self.alltabdata entry)
     def renametab(self):
+        if self.tabWidget.count() == 0: #no tab to rename
+            return
+        curtabnum = self.tabWidget.currentIndex()
         try:
-            curtabnum,_ = self.whatTab()
             name, ok = QInputDialog.getText(self, 'Rename Current Tab', 'Enter new tab name:',QLineEdit.Normal,str(self.tabWidget.tabText(curtabnum)))
-            if ok:
-                self.tabWidget.setTabText(curtabnum,name)
         except Exception:
             trace_error()
             self.posterror("Failed to rename the current tab")
+            return
+        if ok:
+            self.tabWidget.setTabText(curtabnum,name)
     
-    #sets default color scheme for tabs
+    #sets default color scheme for tabs (palette is built on the first call and shared by all tabs)
     def setnewtabcolor(self,tab):
-        p = QPalette()
-        gradient = QLinearGradient(0, 0, 0, 400)
-        gradient.setColorAt(0.0, QColor(255,253,253))
-        #gradient.setColorAt(1.0, QColor(248, 248, 255))
-        gradient.setColorAt(1.0, QColor(255, 225, 225))
-        p.setBrush(QPalette.Window, QBrush(gradient))
+        if self.tabpalette is None:
+            self.tabpalette = QPalette()
+            gradient = QLinearGradient(0, 0, 0, 400)
+            gradient.setColorAt(0.0, QColor(255,253,253))
+            #gradient.setColorAt(1.0, QColor(248, 248, 255))
+            gradient.setColorAt(1.0, QColor(255, 225, 225))
+            self.tabpalette.setBrush(QPalette.Window, QBrush(gradient))
         tab.setAutoFillBackground(True)
-        tab.setPalette(p)
+        tab.setPalette(self.tabpalette)
             
         
     #closes a tab
     def closecurrenttab(self):
+        if self.tabWidget.count() == 0: #no tab to close
+            return
         try:
-            reply = QMessageBox.question(self, 'Message',
-                "Are you sure to close the current tab?", QMessageBox.Yes | 
-                QMessageBox.No, QMessageBox.No)
+            reply = self.postquestion("Are you sure to close the current tab?")
 
             if reply == QMessageBox.Yes:
 
                 #getting tab to close
-                curtabnum,_ = self.whatTab()
-                
-                #add any additional necessary commands (stop threads, prevent memory leaks, etc) here
+                curtabnum = self.tabWidget.currentIndex()
                 
-                #closing tab
+                #stopping the tab's processor before its widgets are freed (cleared first so updateUIfinal doesn't count the stop twice)
+                td = self.alltabdata[curtabnum]
+                if td.isprocessing:
+                    td.isprocessing = False
+                    self.nprocessing -= 1
+                    td.Processor.abort()
+                    
+                #closing tab (removeTab only detaches the widget- deleteLater frees it and its children, including the figure canvas)
+                tabwidget = self.tabWidget.widget(curtabnum)
                 self.tabWidget.removeTab(curtabnum)
+                tabwidget.deleteLater()
 
-                #removing current tab data from the self.alltabdata dict, correcting tabnumbers variable
+                #removing current tab data from the self.alltabdata list, correcting tab ID lookup
                 self.alltabdata.pop(curtabnum)
-                self.tabnumbers.pop(curtabnum)
+                self.rebuildtabindices()
 
         except Exception:
             trace_error()
             self.posterror("Failed to close the current tab")
                 
     def cleantempfiles(self):
-        # delete all temporary files
-        allfilesanddirs = listdir(self.tempdir)
-        for cfile in allfilesanddirs:
-            if len(cfile) >= 5:
-                cfilestart = cfile[:4]
-                cfileext = cfile[-3:]
-                if (cfilestart.lower() == 'temp' and cfileext.lower() == 'wav'):
-                    remove(self.tempdir + self.slash + cfile)
+        # delete all temporary files written this session (nothing to do if no processor was started)
+        if not self.anytempfiles:
+            return
+        for cfile in self.tempfiles:
+            if path.exists(cfile):
+                remove(cfile)
+        self.tempfiles.clear()
+        self.anytempfiles = False
+        
+    #deletes temporary WAV files left behind by a previous session that didn't close cleanly (called once at startup)
+    def cleanoldtempfiles(self):
+        for cfile in glob(path.join(self.tempdir, "tempwav_*.WAV")):
+            try:
+                remove(cfile)
+            except OSError: #e.g. file still held open by another instance
+                pass
+        
+    #shows a cached message box with the specified text- if that box is already on screen (e.g. a second processor
+    #error arrives while the first is displayed), a one-off copy is shown instead so the open message isn't overwritten
+    def execmessagebox(self,box,text):
+        if box.isVisible():
+            newbox = QMessageBox(box.icon(), box.windowTitle(), text, box.standardButtons(), box.parentWidget())
+            if box.defaultButton() is not None:
+                newbox.setDefaultButton(box.standardButton(box.defaultButton()))
+            return newbox.exec_()
+        box.setText(text)
+        return box.exec_()
         
     #warning message
     def postwarning(self,warningtext):
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Warning)
-        msg.setText(warningtext)
-        msg.setWindowTitle("Warning")
-        msg.setStandardButtons(QMessageBox.Ok)
-        msg.exec_()
+        self.execmessagebox(self.warningbox, warningtext)
         
     #error message
     def posterror(self,errortext):
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Critical)
-        msg.setText(errortext)
-        msg.setWindowTitle("Error")
-        msg.setStandardButtons(QMessageBox.Ok)
-        msg.exec_()
+        self.execmessagebox(self.errorbox, errortext)
     
     #warning message with options (Okay or Cancel)
     def postwarning_option(self,warningtext):
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Warning)
-        msg.setText(warningtext)
-        msg.setWindowTitle("Warning")
-        msg.setStandardButtons(QMessageBox.Ok | QMessageBox.Cancel)
-        outval = msg.exec_()
-        option = 'unknown'
-        if outval == 1024:
-            option = 'okay'
-        elif outval == 4194304:
-            option = 'cancel'
-        return option
+        return _OPT_MAP.get(self.execmessagebox(self.optionbox, warningtext), 'unknown')
+    
+    #yes/no question (defaults to No), returns QMessageBox.Yes or QMessageBox.No
+    def postquestion(self,questiontext):
+        return self.execmessagebox(self.questionbox, questiontext)
     
     #add warning message before closing GUI
     def closeEvent(self, event):
-        reply = QMessageBox.question(self, 'Message',
-            "Are you sure to close the application? \n All unsaved work will be lost!", QMessageBox.Yes | 
-            QMessageBox.No, QMessageBox.No)
+        reply = self.postquestion("Are you sure to close the application? \n All unsaved work will be lost!")
         if reply == QMessageBox.Yes:
 
-            #explicitly closing figures to clean up memory (should be redundant here but just in case)
-            for tab in self.alltabdata:
-                plt.close(tab["SpectroFig"])
-
-                #aborting all threads
-                if tab["isprocessing"]:
-                    tab["Processor"].abort()
+            #aborting all threads- every processor is flagged to stop first so they wind down together, then each is cleaned up
+            if self.nprocessing:
+                processors = [tab.Processor for tab in self.alltabdata if tab.isprocessing]
+                for processor in processors:
+                    processor.requestabort()
+                for processor in processors:
+                    processor.abort()
+                    
+            #removing tabs last to first so QTabWidget doesn't shift/relayout the remaining tabs after each removal
+            for i in range(self.tabWidget.count()-1, -1, -1):
+                self.tabWidget.removeTab(i)
+                
             self.cleantempfiles()
             event.accept()
         else:
@@ -1162,6 +1392,25 @@ class RunProgram(QMainWindow):
             
     
 
+# =============================================================================
+#        PER-TAB DATA CONTAINER
+# =============================================================================
+#slotted container for all widgets/data associated with a tab (fixed attributes, no per-instance __dict__)
+class TabData:
+    __slots__ = ("tab", "tablayout", "mainLayout", "tabtype", "tabwidget", "mainsettingswidget", "plotsavewidget", 
+                 "signalmaskwidget", "stats", "isprocessing", "Processor", "datasource", "data", "tabnum", "tabwidgets", 
+                 "SpectroFig", "SpectroCanvas", "SpectroAxes", "SpectroToolbar", "colorbar", "mainsettingslayout", 
+                 "plotsavelayout", "timelabel", "plotsavebuilt", "fromAudio", "SpectroImage", 
+                 "plotpending", "plotrequested")
+    
+    def __init__(self, **kwargs):
+        for key in self.__slots__: #unspecified attributes default to None
+            setattr(self, key, kwargs.get(key))
+            
+            
+            
+            
+            
 # =============================================================================
 #        POPUP WINDOW FOR AUDIO CHANNEL SELECTION
 # =============================================================================
@@ -1175,7 +1424,6 @@ class AudioWindow(QWidget):
         self.setLayout(self.layout)
         
         self.selectedChannel = 1
-        self.wasClosed = False
         self.nchannels = nchannels
         self.fname = fname
         self.tabID = tabID
@@ -1201,28 +1449,23 @@ class AudioWindow(QWidget):
     def selectChannel(self):
         self.selectedChannel = self.spinbox.value()
         
-        #format is Audio<channel#><filename> e.g. Audio0002/My/File.WAV
-        #allowing for 5-digit channels since WAV file channel is a 16-bit integer, can go to 65,536
-        self.datasource = f"AAA-{self.selectedChannel:05d}-{self.fname}" 
-        
-        #emit signal
-        self.signals.closed.emit(True, self.tabID, self.datasource)
+        #emit signal (channel and filename are passed separately- the main program builds the datasource), 
+        #then disconnect so closing the window doesn't report a cancellation
+        self.signals.closed.emit(True, self.tabID, self.selectedChannel, self.fname)
+        self.signals.closed.disconnect()
         
         #close dialogue box
-        self.wasClosed = True
         self.close()
         
         
     # add warning message on exit
     def closeEvent(self, event):
         event.accept()
-        if not self.wasClosed:
-            self.signals.closed.emit(False, "No", "No")
-            self.wasClosed = True
+        self.signals.closed.emit(False, self.tabID, 0, "") #no receivers if a channel was already selected
             
 #initializing signals for data to be passed back to main loop
 class AudioWindowSignals(QObject): 
-    closed = pyqtSignal(int, int, str)
+    closed = pyqtSignal(int, int, int, str) #(selection made, tabID, channel, filename)
         
         
     
@@ -1246,8 +1489,72 @@ class CustomToolbar(NavigationToolbar):
         NavigationToolbar.__init__(self,canvas_,parent_)
         
         
+        
+#spectrogram canvas that runs a callback (e.g. colorbar creation) the first time it is shown
+class SpectroCanvas(FigureCanvas):
+    def __init__(self,figure_,onfirstshow_):
+        FigureCanvas.__init__(self,figure_)
+        self.onfirstshow = onfirstshow_
+        
+    def showEvent(self, event):
+        FigureCanvas.showEvent(self, event)
+        if self.onfirstshow is not None:
+            onfirstshow = self.onfirstshow
+            self.onfirstshow = None
+            onfirstshow()
+        
+        
 
     
+# =============================================================================
+#        PLOT PREPARATION WORKER
+# =============================================================================
+#max-pools spectra (1D spectrum or 2D freq x time array) over windows of +/- fsc bins centered on inds
+def trimspectra(spectra, fsc, inds):
+    lenspec = spectra.shape[0]
+    inds = np.asarray(inds, dtype=np.int64).ravel()
+    if AP.hasnumba and spectra.ndim == 2: #compiled kernel, single pass over the windows
+        return AP.windowedmax(np.ascontiguousarray(spectra), inds, fsc)
+    sind = np.clip(inds - fsc, 0, lenspec-1)
+    eind = np.clip(inds + fsc, 0, lenspec)
+    #max over every [sind,eind) window in one reduceat call over (start,end) index pairs (every other output spans 
+    #a gap and is discarded)- end indices must be < lenspec, so windows reaching the end take the last bin separately
+    trimmed = np.maximum.reduceat(spectra, np.column_stack((sind, np.minimum(eind, lenspec-1))).ravel(), axis=0)[::2]
+    atend = eind == lenspec
+    if atend.any():
+        trimmed[atend] = np.maximum(trimmed[atend], spectra[-1])
+    return trimmed
+
+    
+    
+#trims new spectrogram columns off of the GUI thread, returns them to RunProgram.plotprepared
+class PlotPrepWorker(QRunnable):
+    def __init__(self, tabID, spectra, cols, inds, fsc):
+        super(PlotPrepWorker, self).__init__()
+        self.tabID = tabID
+        self.spectra = spectra
+        self.cols = cols
+        self.inds = inds
+        self.fsc = fsc
+        self.signals = PlotPrepSignals()
+        
+    @pyqtSlot()
+    def run(self):
+        try:
+            trimmed = trimspectra(self.spectra, self.fsc, self.inds)
+        except Exception:
+            trace_error()
+            trimmed = None
+        self.signals.prepared.emit(self.tabID, self.cols, trimmed, self.inds)
+        
+#signal carrying (tabID, column indices, trimmed spectra, plot indices used) back to the main loop
+class PlotPrepSignals(QObject):
+    prepared = pyqtSignal(int, object, object, object)
+    
+    
+    
+    
+    
 # =============================================================================
 # EXECUTE PROGRAM
 # =============================================================================